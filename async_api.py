@@ -0,0 +1,271 @@
+"""asyncio client for the osu! API, for batch jobs with many requests in flight.
+
+AsyncOsuClient has the same calls as osu_api (token exchange, profile, best scores,
+beatmap lookup, rankings, images). Hundreds of requests run concurrently on one event
+loop instead of one thread each. It shares osu_api's caches and rate limiter, so
+throughput is bounded by the API budget (osu_api.limiter), not by the client.
+Concurrent requests for the same cache key are sent only once.
+
+Needs aiohttp (optional, only imported here):
+
+    pip install aiohttp
+
+    async with AsyncOsuClient() as client:
+        players = await client.get_players(token, ["Player1", "Player2"], "osu")
+
+For the Tk UI or other synchronous code, SyncClient runs the client on a background
+event loop thread:
+
+    client = async_api.sync_client()
+    players = client.run("get_players", token, users, "osu")
+"""
+import asyncio
+import atexit
+import importlib.util
+import threading
+import time
+
+import osu_api
+import perf
+from models import Beatmap, parse_scores
+from osu_api import RequestCancelled
+
+MAX_CONNECTIONS = 100
+DNS_CACHE_TTL = 300
+
+
+def available():
+    return importlib.util.find_spec("aiohttp") is not None
+
+
+class AsyncOsuClient:
+    def __init__(self, max_connections=MAX_CONNECTIONS, background=False, cancelled=None, budget=None):
+        """`background`: nur freies Rate-Limit-Budget nutzen (wie osu_api.low_priority).
+        `cancelled()` -> True bricht wartende Requests mit RequestCancelled ab.
+        `budget`: ratelimit.RequestBudget, das jeder API-Request-Versuch verbraucht (wie osu_api.counted)."""
+        self.max_connections = max_connections
+        self.reserve = osu_api.BACKGROUND_RESERVE if background else 0
+        self.cancelled = cancelled
+        self.budget = budget
+        self._session = None
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def session(self):
+        if self._session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=DNS_CACHE_TTL)
+            timeout = aiohttp.ClientTimeout(total=osu_api.REQUEST_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _acquire(self):
+        # Gleicher Token Bucket wie die synchronen Requests, aber ohne Thread zu blockieren
+        start = time.perf_counter()
+        while True:
+            wait = osu_api.limiter.reserve(self.reserve)
+            if wait == 0.0:
+                break
+            if self.cancelled is not None and self.cancelled():
+                return False
+            await asyncio.sleep(min(wait, 0.5))
+        waited = time.perf_counter() - start
+        if waited > 0.001:
+            perf.record("ratelimit.wait", waited)
+        return True
+
+    async def _request(self, endpoint, method, request_url, limited=True, read="json", **kwargs):
+        # Wie osu_api._request: perf pro Endpoint, Retries bei 429/5xx/Verbindungsfehlern
+        import aiohttp
+        session = await self.session()
+        for attempt in range(osu_api.MAX_RETRIES + 1):
+            if limited and self.budget is not None and not self.budget.take():
+                raise RequestCancelled(endpoint)
+            if limited and not await self._acquire():
+                raise RequestCancelled(endpoint)
+            status, headers = None, {}
+            with perf.timer(f"api.{endpoint}"):
+                try:
+                    async with session.request(method, request_url, **kwargs) as response:
+                        status, headers = response.status, response.headers
+                        perf.count(f"api.{endpoint}.status.{status}")
+                        if not osu_api._should_retry(status) or attempt == osu_api.MAX_RETRIES:
+                            response.raise_for_status()
+                            if read == "json":
+                                return await response.json(content_type=None)
+                            return await response.read()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    perf.count(f"api.{endpoint}.error")
+                    if attempt == osu_api.MAX_RETRIES:
+                        raise
+                except Exception:
+                    perf.count(f"api.{endpoint}.error")
+                    raise
+            perf.count(f"api.{endpoint}.retry")
+            await asyncio.sleep(osu_api._retry_delay(status, headers, attempt))
+
+    async def _cached(self, cache, key, load):
+        # Wie TTLCache.get_or_load, aber gleichzeitige Anfragen für denselben Key teilen sich einen Request
+        value = cache.get(key)
+        if value is not None:
+            return value
+        inflight_key = (cache.name, key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            async def load_and_store():
+                result = await load()
+                cache.set(key, result)
+                return result
+
+            task = self._inflight[inflight_key] = asyncio.ensure_future(load_and_store())
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        return await asyncio.shield(task)
+
+    # --- API (gleiche Signaturen wie osu_api) ---
+
+    async def exchange_token(self, code, client_id, client_secret):
+        data = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": osu_api.REDIRECT_URI
+        }
+        return await self._request("token", "POST", osu_api.url(osu_api.TOKEN_PATH), json=data)
+
+    async def client_credentials_token(self, client_id, client_secret):
+        data = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "grant_type": "client_credentials",
+            "scope": "public"
+        }
+        return await self._request("token", "POST", osu_api.url(osu_api.TOKEN_PATH), json=data)
+
+    async def get_user_profile(self, token, mode=None):
+        async def load():
+            headers = {"Authorization": f"Bearer {token}"}
+            path = f"{osu_api.API_ME_PATH}/{mode}" if mode else osu_api.API_ME_PATH
+            profile = await self._request("me", "GET", osu_api.url(path), headers=headers)
+            osu_api.profile_cache.set(("user", str(profile.get("id")), mode), profile)
+            return profile
+
+        return await self._cached(osu_api.profile_cache, ("me", token, mode), load)
+
+    async def get_user(self, token, user, mode=None):
+        user = str(user).strip()
+        key = "id" if user.isdigit() else "username"
+
+        async def load():
+            headers = {"Authorization": f"Bearer {token}"}
+            path = osu_api.API_USER_PATH.format(user=user) + (f"/{mode}" if mode else "")
+            profile = await self._request("user", "GET", osu_api.url(path), headers=headers, params={"key": key})
+            osu_api.profile_cache.set(("user", str(profile.get("id")), mode), profile)
+            osu_api.profile_cache.set(("user", profile.get("username", "").lower(), mode), profile)
+            return profile
+
+        return await self._cached(osu_api.profile_cache, ("user", user.lower(), mode), load)
+
+    async def get_user_best_scores(self, token, user_id, mode, mods=None, limit=20):
+        headers = {"Authorization": f"Bearer {token}"}
+        params = {"mode": mode, "limit": osu_api.BEST_SCORES_LIMIT}
+        if mods:
+            params["mods"] = mods
+
+        async def load():
+            path = osu_api.API_USER_BEST_SCORES_PATH.format(user_id=user_id)
+            data = await self._request("best_scores", "GET", osu_api.url(path), headers=headers, params=params)
+            with perf.timer("parse.best_scores"):
+                return parse_scores(data)
+
+        return (await self._cached(osu_api.scores_cache, (int(user_id), mode, mods or ""), load))[:limit]
+
+    async def get_beatmap(self, token, beatmap_id):
+        async def load():
+            headers = {"Authorization": f"Bearer {token}"}
+            path = osu_api.API_BEATMAP_PATH.format(beatmap_id=beatmap_id)
+            return Beatmap.from_api(await self._request("beatmap", "GET", osu_api.url(path), headers=headers))
+
+        return await self._cached(osu_api.beatmap_cache, int(beatmap_id), load)
+
+    async def get_rankings(self, token, mode, page=1, country=None):
+        headers = {"Authorization": f"Bearer {token}"}
+        params = {"cursor[page]": page}
+        if country:
+            params["country"] = country
+        path = osu_api.API_RANKINGS_PATH.format(mode=mode)
+        return await self._request("rankings", "GET", osu_api.url(path), headers=headers, params=params)
+
+    async def download_image(self, image_url):
+        async def load():
+            return await self._request("image", "GET", image_url, limited=False, read="bytes")
+
+        return await self._cached(osu_api.image_cache, image_url, load)
+
+    # --- Batch ---
+
+    async def get_players(self, token, users, mode, limit=100):
+        """Wie osu_api.get_players: [(profile, scores) oder Exception] in der Reihenfolge von `users`."""
+        async def load(user):
+            profile = await self.get_user(token, user, mode)
+            return profile, await self.get_user_best_scores(token, profile["id"], mode, limit=limit)
+
+        return await asyncio.gather(*(load(user) for user in users), return_exceptions=True)
+
+    async def get_best_scores_many(self, token, user_ids, mode, limit=100):
+        """Best Scores vieler Spieler: [scores oder Exception] in der Reihenfolge von `user_ids`."""
+        return await asyncio.gather(
+            *(self.get_user_best_scores(token, user_id, mode, limit=limit) for user_id in user_ids),
+            return_exceptions=True,
+        )
+
+
+class SyncClient:
+    """Synchroner Zugriff auf einen AsyncOsuClient, der in einem eigenen Event-Loop-Thread läuft.
+
+    run() blockiert bis zum Ergebnis, submit() liefert ein concurrent.futures.Future.
+    """
+
+    def __init__(self, **client_kwargs):
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncOsuClient(**client_kwargs)
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="async-api")
+        self._thread.start()
+
+    def submit(self, name, *args, **kwargs):
+        method = getattr(self.client, name)
+        return asyncio.run_coroutine_threadsafe(method(*args, **kwargs), self.loop)
+
+    def run(self, name, *args, timeout=None, **kwargs):
+        return self.submit(name, *args, **kwargs).result(timeout)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_sync_client = None
+_sync_lock = threading.Lock()
+
+
+def sync_client():
+    """Gemeinsamer SyncClient (wird beim ersten Aufruf gestartet)."""
+    global _sync_client
+    if _sync_client is None:
+        with _sync_lock:
+            if _sync_client is None:
+                _sync_client = SyncClient()
+                atexit.register(_sync_client.close)
+    return _sync_client
@@ -0,0 +1,355 @@
+"""End-to-end benchmarks against the local mock API (mock_server.py).
+
+Measures cold/warm profile load (fetch + parse of profile, best scores and images),
+building the score rows for 20/100/500 already parsed scores (_build_score_rows, without
+the cover downloads that _display_scores_ui starts in the background),
+image download+decode throughput (cold and cached), recommender ranking latency and
+memory high-water marks.
+Results are written to benchmarks/results/<commit>.json so runs can be compared:
+
+    python benchmarks/bench.py                      # alles, Ergebnis unter der aktuellen Commit-ID
+    python benchmarks/bench.py --only profile,recommender --repeat 10
+    python benchmarks/bench.py --compare <commit>   # Vergleich mit einem gespeicherten Lauf
+
+The UI benchmarks need a display. Without $DISPLAY an Xvfb server is started if
+available, otherwise they are skipped (reported as "skipped").
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import collaborative  # noqa: E402
+import mock_server  # noqa: E402
+import osu_api  # noqa: E402
+import perf  # noqa: E402
+import recommender  # noqa: E402
+from models import Score, parse_scores  # noqa: E402
+from prefetch import Prefetcher  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BENCHMARKS = ["profile", "mode_switch", "render", "images", "recommender"]
+RENDER_SIZES = [20, 100, 500]
+REGRESSION_THRESHOLD = 0.10  # 10% langsamer -> markieren
+
+
+def measure(fn, repeat, setup=None):
+    """fn `repeat` mal ausführen; Laufzeiten in ms und tracemalloc-Peak in KiB.
+
+    `setup()` läuft vor jeder Wiederholung und wird nicht mitgemessen.
+    """
+    times = []
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "repeat": repeat,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def reset_client():
+    # Neue Session und leere Caches = Zustand wie beim Programmstart
+    if osu_api._session is not None:
+        osu_api._session.close()
+    osu_api._session = None
+    osu_api.clear_caches()
+
+
+def load_profile_view(token, mode):
+    # Entspricht login -> load_profile + load_scores (ohne Tk)
+    profile = osu_api.get_user_profile(token, mode)
+    osu_api.download_image(profile["avatar_url"])
+    scores = osu_api.get_user_best_scores(token, profile["id"], mode)
+    for score in scores:
+        osu_api.download_image(score.beatmap.cover_url)
+    return scores
+
+
+def bench_profile(server, token, repeat):
+    def cold():
+        reset_client()
+        load_profile_view(token, "osu")
+
+    def warm():
+        load_profile_view(token, "osu")
+
+    server.reset_stats()
+    results = {"cold": measure(cold, repeat)}
+    load_profile_view(token, "osu")
+    results["warm"] = measure(warm, repeat)
+    results["upstream_requests"] = server.stats()
+    return results
+
+
+def bench_mode_switch(server, token, repeat):
+    # Moduswechsel nach dem Login: ohne Prefetch (kalt) und nachdem der Prefetcher fertig ist
+    modes = osu_api.MODE_OPTIONS
+
+    def switch_all():
+        for mode in modes[1:]:
+            load_profile_view(token, mode)
+
+    def cold():
+        reset_client()
+        load_profile_view(token, modes[0])
+        switch_all()
+
+    def prefetched():
+        reset_client()
+        user_id = osu_api.get_user_profile(token, modes[0])["id"]
+        load_profile_view(token, modes[0])
+        prefetcher = Prefetcher(token, user_id)
+        prefetcher.start(modes[0])
+        prefetcher._thread.join()
+        start = time.perf_counter()
+        switch_all()
+        switch_times.append((time.perf_counter() - start) * 1000)
+
+    switch_times = []
+    osu_api.limiter.configure(per_minute=100000, burst=1000)  # Budget hier nicht messen
+    try:
+        results = {"cold": measure(cold, repeat)}
+        measure(prefetched, repeat)
+    finally:
+        osu_api.limiter.configure(per_minute=osu_api.REQUESTS_PER_MINUTE, burst=osu_api.BURST)
+    results["after_prefetch_median_ms"] = round(statistics.median(switch_times), 3)
+    results["cache_hit_rates"] = perf.hit_rates()
+    return results
+
+
+def synthetic_scores_for(server, user_id):
+    payload = json.dumps(server.data.best_scores(user_id, "osu")).replace("{base}", server.base_url)
+    return parse_scores(json.loads(payload))
+
+
+def synthetic_scores(server, count):
+    # Scores mehrerer Spieler zusammenlegen, damit auch 500 Einträge möglich sind
+    scores = []
+    user_id = 1
+    while len(scores) < count:
+        scores.extend(synthetic_scores_for(server, user_id))
+        user_id += 1
+    return scores[:count]
+
+
+def start_virtual_display():
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None
+    display = ":97"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return proc
+
+
+def bench_render(server, token, repeat):
+    xvfb = start_virtual_display()
+    try:
+        import tkinter
+        try:
+            import main
+            app = main.MainApp()
+        except tkinter.TclError as e:
+            return {"skipped": f"no display ({e})"}
+        app.withdraw()
+        results = {}
+        try:
+            for size in RENDER_SIZES:
+                scores = synthetic_scores(server, size)
+
+                # _build_score_rows statt _display_scores_ui: load_covers() würde im Hintergrund Cover
+                # laden und dekodieren und die gemessenen Zeiten verfälschen
+                def render():
+                    app._build_score_rows(scores)
+                    app.update_idletasks()
+
+                # große Listen seltener wiederholen, sonst dauert der Lauf Minuten
+                runs = max(1, repeat * 20 // size)
+                # "<n>": jedes Mal aus leerer Liste (alle Zeilen neu, vergleichbar mit älteren Commits),
+                # "<n>_same_list": dieselbe Liste nochmal anzeigen (Diff ohne Änderungen)
+                results[str(size)] = measure(render, runs, setup=app.clear_scores)
+                results[f"{size}_same_list"] = measure(render, runs)
+
+            # Gleiche Liste mit einem geänderten Score: nur eine Zeile darf sich ändern
+            scores = synthetic_scores(server, 100)
+            app._build_score_rows(scores)
+            changed = list(scores)
+            first = changed[0]
+            changed[0] = Score(first.id, first.user_id, first.beatmap, first.pp + 1, first.accuracy, first.score,
+                               first.max_combo, first.rank, first.mods, first.created_at, first.extra_mods)
+            before = score_row_updates()
+            results["100_one_changed"] = measure(lambda: app._build_score_rows(changed), 1)
+            updated = score_row_updates() - before
+            results["100_one_changed"]["rows_updated"] = updated
+            if perf.enabled and updated != 1:
+                raise AssertionError(f"100_one_changed: expected 1 updated score row, got {updated}")
+        finally:
+            app.destroy()
+        return results
+    finally:
+        if xvfb:
+            xvfb.terminate()
+
+
+def score_row_updates():
+    # Anzahl der Score-Zeilen, deren Widgets tatsächlich geändert wurden (perf-Timer ui.score_row)
+    return perf.snapshot()["timers"].get("ui.score_row", {}).get("count", 0)
+
+
+def bench_images(server, token, repeat, count=50):
+    from io import BytesIO
+    from PIL import Image
+
+    urls = [f"{server.base_url}/covers/{500000 + i}/cover.jpg" for i in range(count)]
+
+    def pipeline():
+        for url in urls:
+            data = osu_api.download_image(url)
+            with Image.open(BytesIO(data)) as img:
+                img.resize((80, 80), Image.LANCZOS)
+
+    # cold: Bild-Cache vor jedem Lauf leeren (Download + Decode), warm: nur Decode/Resize
+    result = {"cold": measure(pipeline, repeat, setup=osu_api.image_cache.clear)}
+    result["cold"]["images_per_s"] = round(count / (result["cold"]["median_ms"] / 1000), 1)
+    result["warm"] = measure(pipeline, repeat)
+    result["warm"]["images_per_s"] = round(count / (result["warm"]["median_ms"] / 1000), 1)
+    return result
+
+
+def bench_recommender(server, token, repeat, players=500):
+    scores_by_user = {uid: synthetic_scores_for(server, uid) for uid in range(1, players + 1)}
+    all_scores = [s for scores in scores_by_user.values() for s in scores]
+    candidates = recommender.candidates_from_scores(all_scores)
+    user_scores = scores_by_user[1]
+
+    result = {"content": measure(lambda: recommender.recommend(user_scores, candidates, 10), repeat)}
+    result["content"]["candidates"] = len(candidates)
+
+    matrix = collaborative.PlayMatrix()
+    for uid, scores in scores_by_user.items():
+        matrix.add_player(uid, scores)
+    result["collaborative"] = measure(lambda: collaborative.recommend(user_scores, matrix, 10), repeat)
+    result["collaborative"]["players"] = matrix.players
+    return result
+
+
+def git_commit():
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                             cwd=ROOT, text=True).strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def max_rss_kib():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif key == "median_ms":
+            yield prefix.rstrip("."), value
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = dict(flatten(baseline["results"]))
+    print(f"\ncompared to {baseline['commit']} (median ms):")
+    regressions = 0
+    for name, value in flatten(current["results"]):
+        if name not in old or not old[name]:
+            continue
+        change = (value - old[name]) / old[name]
+        flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"  {name:<32} {old[name]:>10.2f} -> {value:>10.2f}  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks against the local mock osu! API.")
+    parser.add_argument("--only", help=f"comma separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20, help="mock API latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--compare", help="commit id of a stored result to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write benchmarks/results/<commit>.json")
+    args = parser.parse_args(argv)
+
+    selected = args.only.split(",") if args.only else BENCHMARKS
+    server = mock_server.MockOsuServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms).start()
+    osu_api.configure(base=server.base_url)
+    token = osu_api.client_credentials_token("bench", "bench")["access_token"]
+
+    results = {}
+    try:
+        for name in selected:
+            print(f"[bench] {name} ...", file=sys.stderr)
+            results[name] = globals()[f"bench_{name}"](server, token, args.repeat)
+    finally:
+        server.stop()
+
+    sha, dirty = git_commit()
+    report = {
+        "commit": sha,
+        "dirty": dirty,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mock_latency_ms": args.latency_ms,
+        "max_rss_kib": max_rss_kib(),
+        "results": results,
+        "perf": perf.snapshot()["timers"],
+    }
+    print(json.dumps(report["results"], indent=2))
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{sha}{'-dirty' if dirty else ''}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] saved {path}", file=sys.stderr)
+
+    if args.compare:
+        regressions = compare(report, os.path.join(RESULTS_DIR, f"{args.compare}.json"))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
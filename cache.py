@@ -0,0 +1,69 @@
+"""Thread-safe in-memory caches shared by the UI, prefetcher and batch tools."""
+import threading
+import time
+from collections import OrderedDict
+
+import perf
+
+
+class TTLCache:
+    """LRU-Cache mit Ablaufzeit pro Eintrag und optionaler Größengrenze (z.B. Bytes).
+
+    `name` wird für perf-Hit-Raten verwendet, `sizeof` bestimmt die Größe eines Werts
+    (Standard: 1 pro Eintrag, dann ist `max_size` die maximale Anzahl Einträge).
+    """
+
+    def __init__(self, name, ttl, max_size, sizeof=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 1)
+        self.size = 0
+        self._data = OrderedDict()  # key -> (expires, size, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+        perf.cache(self.name, entry is not None)
+        return entry[2] if entry is not None else default
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+
+    def set(self, key, value, ttl=None):
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), size, value)
+            self.size += size
+            while self.size > self.max_size:
+                self._remove(next(iter(self._data)))
+        perf.gauge(f"cache.{self.name}.size", self.size)
+
+    def get_or_load(self, key, load):
+        # Kein Lock während `load` (Netzwerk); doppelte Requests sind hier unkritisch
+        value = self.get(key)
+        if value is None:
+            value = load()
+            self.set(key, value)
+        return value
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self.size -= size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
@@ -0,0 +1,160 @@
+"""Headless batch mode: fetch best scores for many users and write recommendations as JSON Lines.
+
+Usage:
+    python cli.py 2 124493 7562902 --mode osu --out results.jsonl
+    python cli.py --users-file users.txt --workers 16
+    python cli.py --users-file users.txt --async     # alle Requests auf einem Event Loop (aiohttp)
+
+Imports no GUI modules, so it runs on a server without a display.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import collaborative
+import osu_api
+import perf
+import recommender
+
+
+def read_user_ids(args, parser):
+    user_ids = list(args.user_ids)
+    if args.users_file:
+        with open(args.users_file, "r") as f:
+            user_ids.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    # Best Scores gibt es nur per ID; Usernamen früh ablehnen statt pro User einen Fehler zu schreiben
+    invalid = [user_id for user_id in user_ids if not user_id.isdigit()]
+    if invalid:
+        parser.error(f"user ids must be numeric: {', '.join(invalid[:5])}")
+    return user_ids
+
+
+def fetch_all(token, user_ids, mode, limit, workers):
+    """Best Scores aller User parallel holen. Liefert {user_id: scores oder Exception}."""
+    pending = [len(user_ids)]
+    lock = threading.Lock()
+
+    def fetch(user_id):
+        try:
+            return osu_api.get_user_best_scores(token, user_id, mode, limit=limit)
+        except Exception as e:
+            return e
+        finally:
+            with lock:
+                pending[0] -= 1
+                perf.gauge("queue.cli_fetch", pending[0])
+
+    perf.gauge("queue.cli_fetch", len(user_ids))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(user_ids, pool.map(fetch, user_ids)))
+
+
+def fetch_all_async(token, user_ids, mode, limit):
+    """Wie fetch_all, aber mit async_api (ohne Thread pro Request; Durchsatz nur durch das Rate-Limit begrenzt)."""
+    import asyncio
+    import async_api
+
+    async def run():
+        async with async_api.AsyncOsuClient() as client:
+            return await client.get_best_scores_many(token, user_ids, mode, limit)
+
+    return dict(zip(user_ids, asyncio.run(run())))
+
+
+def load_matrix(path, mode):
+    if path and os.path.exists(path):
+        matrix = collaborative.PlayMatrix.load(path)
+        if matrix.mode != mode:
+            raise SystemExit(f"{path} was built for mode {matrix.mode}, not {mode}")
+        return matrix
+    return collaborative.PlayMatrix(mode)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch osu! best scores and beatmap recommendations for many users.")
+    parser.add_argument("user_ids", nargs="*", help="osu! user ids")
+    parser.add_argument("--users-file", help="file with one user id per line")
+    parser.add_argument("--mode", default=osu_api.MODE_OPTIONS[0], choices=osu_api.MODE_OPTIONS)
+    parser.add_argument("--limit", type=int, default=100, help="best scores per user (max 100)")
+    parser.add_argument("--recommendations", type=int, default=10, help="recommendations per user")
+    parser.add_argument("--method", default="content", choices=["content", "collaborative"],
+                        help="content: match beatmap attributes; collaborative: top plays of similar players")
+    parser.add_argument("--matrix", help="play matrix file for --method collaborative (loaded, updated with "
+                                         "this batch and saved again)")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent requests")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="fetch with the asyncio client (needs aiohttp); ignores --workers")
+    parser.add_argument("--token", help="osu! API access token (default: client credentials from config)")
+    parser.add_argument("--config", default=osu_api.CONFIG_FILE)
+    parser.add_argument("--base-url", help="API base URL, e.g. http://127.0.0.1:8090 for mock_server.py")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--perf-out", help="write timing/counter snapshot as JSON to this file")
+    args = parser.parse_args(argv)
+
+    user_ids = read_user_ids(args, parser)
+    if not user_ids:
+        parser.error("no user ids given")
+
+    osu_api.configure(osu_api.load_config(args.config), base=args.base_url)
+
+    try:
+        token = osu_api.resolve_token(args.token, args.config)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.use_async:
+        import async_api
+        if not async_api.available():
+            raise SystemExit("--async needs aiohttp (pip install aiohttp)")
+        results = fetch_all_async(token, user_ids, args.mode, args.limit)
+    else:
+        results = fetch_all(token, user_ids, args.mode, args.limit, args.workers)
+
+    # Alle geholten Top Plays bilden zusammen den Kandidaten-Pool
+    all_scores = [s for scores in results.values() if not isinstance(scores, Exception) for s in scores]
+    with perf.timer("recommender.candidates"):
+        candidates = recommender.candidates_from_scores(all_scores)
+
+    matrix = None
+    if args.method == "collaborative":
+        matrix = load_matrix(args.matrix, args.mode)
+        for user_id in user_ids:
+            if not isinstance(results[user_id], Exception):
+                matrix.add_player(user_id, results[user_id])
+        if args.matrix:
+            matrix.save(args.matrix)
+        beatmaps = {beatmap.id: beatmap for beatmap in candidates}
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    failed = 0
+    try:
+        for user_id in user_ids:
+            scores = results[user_id]
+            if isinstance(scores, Exception):
+                failed += 1
+                record = {"user_id": user_id, "mode": args.mode, "error": str(scores)}
+            else:
+                with perf.timer("recommender.recommend"):
+                    if matrix is not None:
+                        recommendations = collaborative.recommend(scores, matrix, args.recommendations, beatmaps)
+                    else:
+                        recommendations = recommender.recommend(scores, candidates, args.recommendations)
+                record = {
+                    "user_id": user_id,
+                    "mode": args.mode,
+                    "scores": len(scores),
+                    "recommendations": recommendations,
+                }
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.perf_out:
+        perf.export_json(args.perf_out)
+    return 1 if failed == len(user_ids) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Collaborative-filtering recommender: "players like you also farm X".
+
+PlayMatrix is a sparse player x beatmap matrix of top plays. Each row is one player.
+A value is that play's pp divided by the player's best pp, so players of different
+skill are comparable. Rows are stored in CSR form in compact `array`s (indptr/indices/data).
+A column index (per beatmap: rows + values) finds the players who share maps with a user
+without scanning the whole matrix. New players are appended incrementally. Re-adding a
+player replaces the old row, which is dropped on the next compact()/save().
+
+Scoring one user = sparse cosine similarity against the rows that share a map, top-k
+neighbours, then each neighbour's other maps weighted by similarity x pp gain.
+"""
+import heapq
+import json
+import math
+from array import array
+
+import perf
+
+MAGIC = "osu-playmatrix-1"
+DEFAULT_NEIGHBOURS = 50
+
+
+def _row_values(scores):
+    # pp relativ zum besten Play des Spielers; doppelte Beatmaps -> bester Wert
+    best = max((s.pp for s in scores), default=0.0)
+    if best <= 0:
+        return {}
+    values = {}
+    for score in scores:
+        beatmap_id = score.beatmap.id
+        value = score.pp / best
+        if value > values.get(beatmap_id, 0.0):
+            values[beatmap_id] = value
+    return values
+
+
+class PlayMatrix:
+    def __init__(self, mode="osu"):
+        self.mode = mode
+        # CSR
+        self.indptr = array("q", [0])
+        self.indices = array("i")
+        self.data = array("f")
+        self.row_users = array("q")    # Zeile -> User-ID
+        self.row_norms = array("d")
+        self.col_beatmaps = array("q")  # Spalte -> Beatmap-ID
+        # Lookups / Spaltenindex (wird aus dem CSR aufgebaut, nicht gespeichert)
+        self.user_rows = {}
+        self.beatmap_cols = {}
+        self.col_rows = []
+        self.col_values = []
+        self.dead_rows = 0
+
+    @property
+    def players(self):
+        return len(self.user_rows)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def __contains__(self, user_id):
+        return int(user_id) in self.user_rows
+
+    def _column(self, beatmap_id):
+        col = self.beatmap_cols.get(beatmap_id)
+        if col is None:
+            col = self.beatmap_cols[beatmap_id] = len(self.col_beatmaps)
+            self.col_beatmaps.append(beatmap_id)
+            self.col_rows.append(array("i"))
+            self.col_values.append(array("f"))
+        return col
+
+    def add_player(self, user_id, scores):
+        """Zeile für `user_id` aus dessen Top Plays (models.Score) anhängen bzw. ersetzen."""
+        user_id = int(user_id)
+        values = _row_values(scores)
+        if user_id in self.user_rows:
+            self.dead_rows += 1
+        if not values:
+            self.user_rows.pop(user_id, None)
+            return
+        row = len(self.row_users)
+        entries = sorted((self._column(b), v) for b, v in values.items())
+        for col, value in entries:
+            self.indices.append(col)
+            self.data.append(value)
+            self.col_rows[col].append(row)
+            self.col_values[col].append(value)
+        self.indptr.append(len(self.indices))
+        self.row_users.append(user_id)
+        # Norm aus den gespeicherten float32-Werten, genau wie _load_csr nach dem Laden
+        self.row_norms.append(math.sqrt(sum(v * v for v in self.data[self.indptr[-2]:])))
+        self.user_rows[user_id] = row
+
+    def row(self, row):
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def _live(self, row):
+        return self.user_rows.get(self.row_users[row]) == row
+
+    def neighbours(self, values, k=DEFAULT_NEIGHBOURS, exclude_user=None):
+        """Top-k ähnlichste Spieler zu `values` ({beatmap_id: wert}) als [(similarity, row)]."""
+        norm = math.sqrt(sum(v * v for v in values.values()))
+        if not norm:
+            return []
+        dots = {}
+        for beatmap_id, value in values.items():
+            col = self.beatmap_cols.get(beatmap_id)
+            if col is None:
+                continue
+            for row, other in zip(self.col_rows[col], self.col_values[col]):
+                dots[row] = dots.get(row, 0.0) + value * other
+        exclude_row = self.user_rows.get(int(exclude_user)) if exclude_user is not None else None
+        norms = self.row_norms
+        candidates = (
+            (dot / (norm * norms[row]), row)
+            for row, dot in dots.items()
+            if row != exclude_row and self._live(row)
+        )
+        return heapq.nlargest(k, candidates)
+
+    def recommend(self, scores, limit=10, k=DEFAULT_NEIGHBOURS, user_id=None):
+        """Beatmap-IDs, die ähnliche Spieler in ihren Top Plays haben, der User aber nicht.
+
+        Liefert [(score, beatmap_id, anzahl_nachbarn)] absteigend nach score.
+        """
+        with perf.timer("recommender.collaborative"):
+            values = _row_values(scores)
+            if user_id is None and scores:
+                user_id = scores[0].user_id or None
+            neighbours = self.neighbours(values, k, exclude_user=user_id)
+            totals = {}
+            counts = {}
+            for similarity, row in neighbours:
+                cols, data = self.row(row)
+                for col, value in zip(cols, data):
+                    totals[col] = totals.get(col, 0.0) + similarity * value
+                    counts[col] = counts.get(col, 0) + 1
+            played = set(values)
+            ranked = heapq.nlargest(
+                limit + len(played),
+                ((total, self.col_beatmaps[col], counts[col]) for col, total in totals.items()),
+            )
+            return [item for item in ranked if item[1] not in played][:limit]
+
+    # --- Speichern / Laden ---
+
+    def compact(self):
+        """Ersetzte Zeilen entfernen (CSR neu aufbauen)."""
+        if not self.dead_rows:
+            return
+        old = (self.indptr, self.indices, self.data, self.row_users)
+        live = [row for row in range(len(self.row_users)) if self._live(row)]
+        self._load_csr(*self._select_rows(old, live), self.col_beatmaps)
+
+    @staticmethod
+    def _select_rows(old, rows):
+        indptr, indices, data, row_users = old
+        new_indptr, new_indices, new_data, new_users = array("q", [0]), array("i"), array("f"), array("q")
+        for row in rows:
+            start, end = indptr[row], indptr[row + 1]
+            new_indices.extend(indices[start:end])
+            new_data.extend(data[start:end])
+            new_indptr.append(len(new_indices))
+            new_users.append(row_users[row])
+        return new_indptr, new_indices, new_data, new_users
+
+    def _load_csr(self, indptr, indices, data, row_users, col_beatmaps):
+        self.indptr, self.indices, self.data, self.row_users = indptr, indices, data, row_users
+        self.col_beatmaps = col_beatmaps
+        self.beatmap_cols = {b: c for c, b in enumerate(col_beatmaps)}
+        self.user_rows = {u: r for r, u in enumerate(row_users)}
+        self.col_rows = [array("i") for _ in col_beatmaps]
+        self.col_values = [array("f") for _ in col_beatmaps]
+        self.row_norms = array("d")
+        for row in range(len(row_users)):
+            cols, vals = self.row(row)
+            for col, value in zip(cols, vals):
+                self.col_rows[col].append(row)
+                self.col_values[col].append(value)
+            self.row_norms.append(math.sqrt(sum(v * v for v in vals)))
+        self.dead_rows = 0
+
+    def save(self, path):
+        self.compact()
+        arrays = [self.indptr, self.indices, self.data, self.row_users, self.col_beatmaps]
+        header = {
+            "magic": MAGIC,
+            "mode": self.mode,
+            "arrays": [[a.typecode, len(a)] for a in arrays],
+        }
+        with open(path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for a in arrays:
+                a.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("magic") != MAGIC:
+                raise ValueError(f"{path} is not a play matrix file")
+            arrays = []
+            for typecode, length in header["arrays"]:
+                a = array(typecode)
+                a.fromfile(f, length)
+                arrays.append(a)
+        matrix = cls(header["mode"])
+        matrix._load_csr(*arrays)
+        return matrix
+
+
+def recommend(user_scores, matrix, limit=10, beatmaps=None, k=DEFAULT_NEIGHBOURS):
+    """Wie recommender.recommend, aber aus den Top Plays ähnlicher Spieler.
+
+    `beatmaps` ({beatmap_id: models.Beatmap}) ergänzt Titel/Artist, falls bekannt.
+    """
+    beatmaps = beatmaps or {}
+    results = []
+    for total, beatmap_id, count in matrix.recommend(user_scores, limit, k):
+        beatmap = beatmaps.get(beatmap_id)
+        result = {"beatmap_id": beatmap_id, "score": round(total, 4), "neighbours": count}
+        if beatmap is not None:
+            result.update({
+                "beatmapset_id": beatmap.beatmapset_id,
+                "artist": beatmap.artist,
+                "title": beatmap.title,
+                "version": beatmap.version,
+                "stars": beatmap.difficulty_rating,
+            })
+        results.append(result)
+    return results
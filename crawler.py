@@ -0,0 +1,242 @@
+"""Resumable crawler that builds the local recommendation corpus (store.py).
+
+Walks the performance rankings page by page and fetches every listed player's best
+scores. Beatmaps are deduplicated in the store. Players are fetched in batches; each
+batch is written in one transaction together with the crawl checkpoint, so a restart
+continues with the next pending player or ranking page and fetches nothing twice.
+Players whose fetch fails (other than 404) get a retry counter in the same transaction;
+they are retried after the untried players and dropped after store.MAX_ATTEMPTS.
+All requests go through the shared osu_api rate limiter. --budget caps how many API
+requests one run may send, retries included (ratelimit.RequestBudget). With --async a
+batch is fetched on one event loop (async_api, needs aiohttp) instead of --workers threads.
+
+    python crawler.py --db corpus.sqlite --mode osu --budget 500
+    python crawler.py --db corpus.sqlite --base-url http://127.0.0.1:8090 --token mock
+    python crawler.py --db corpus.sqlite --budget 5000 --batch-size 200 --async
+    python crawler.py --db corpus.sqlite --budget 0 --matrix osu.playmatrix   # nur Matrix aktualisieren
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import collaborative
+import osu_api
+import perf
+from ratelimit import RequestBudget
+from store import CorpusStore
+
+SCORES_PER_PLAYER = 100
+
+
+def _status(error):
+    # requests: error.response.status_code, aiohttp: error.status
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) or getattr(error, "status", None)
+
+
+class Crawler:
+    def __init__(self, store, token, mode="osu", budget=500, batch_size=20, workers=4, max_pages=None,
+                 background=False, stop_event=None, log=None, use_async=False):
+        self.store = store
+        self.token = token
+        self.mode = mode
+        self.budget = RequestBudget(budget)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_pages = max_pages
+        self.background = background
+        self.stop_event = stop_event or threading.Event()
+        self.log = log or (lambda message: None)
+        self.use_async = use_async
+        self._async = None
+        self.stats = {"pages": 0, "players": 0, "failed": 0, "scores": 0}
+
+    @property
+    def state_key(self):
+        return f"rankings_page:{self.mode}"
+
+    @property
+    def requests(self):
+        return self.budget.used
+
+    def budget_left(self):
+        return self.budget.left
+
+    def _call(self, fn, *args, **kwargs):
+        # Jeder Versuch zählt gegen das Budget; im Hintergrund (z.B. aus der App) nur freies
+        # Rate-Limit-Budget nutzen
+        with osu_api.counted(self.budget):
+            if self.background:
+                with osu_api.low_priority(cancelled=self.stop_event.is_set):
+                    return fn(*args, **kwargs)
+            return fn(*args, **kwargs)
+
+    def run(self):
+        try:
+            with perf.timer("crawler.run"):
+                while self.budget_left() > 0 and not self.stop_event.is_set():
+                    pending = self.store.pending_players(self.mode, min(self.batch_size, self.budget_left()))
+                    if pending:
+                        self._crawl_players(pending)
+                    elif not self._crawl_rankings_page():
+                        break
+        finally:
+            if self._async is not None:
+                self._async.close()
+                self._async = None
+        return {"run": dict(self.stats, requests=self.requests), "store": self.store.counts(self.mode)}
+
+    def _crawl_rankings_page(self):
+        page = self.store.get_state(self.state_key, "1")
+        if page == "done" or (self.max_pages and int(page) > self.max_pages):
+            self.log("rankings exhausted")
+            return False
+        page = int(page)
+        try:
+            data = self._call(osu_api.get_rankings, self.token, self.mode, page)
+        except osu_api.RequestCancelled:
+            return False  # Budget aufgebraucht oder gestoppt
+        cursor = data.get("cursor") or {}
+        players = [
+            (entry["user"]["id"], entry["user"].get("username"), entry.get("pp"), entry.get("global_rank"))
+            for entry in data.get("ranking", [])
+        ]
+        next_page = cursor.get("page") if players else None
+        self.store.add_players(self.mode, players, state={self.state_key: next_page or "done"})
+        self.stats["pages"] += 1
+        self.log(f"rankings page {page}: {len(players)} players")
+        return True
+
+    def _fetch(self, user_id):
+        if self.stop_event.is_set():
+            return user_id, None
+        try:
+            return user_id, self._call(osu_api.get_user_best_scores, self.token, user_id, self.mode,
+                                       limit=SCORES_PER_PLAYER)
+        except osu_api.RequestCancelled:
+            return user_id, None
+        except Exception as e:
+            return user_id, e
+
+    def _fetch_async(self, user_ids):
+        if self._async is None:
+            import async_api
+            self._async = async_api.SyncClient(background=self.background, cancelled=self.stop_event.is_set,
+                                               budget=self.budget)
+        results = self._async.run("get_best_scores_many", self.token, user_ids, self.mode, SCORES_PER_PLAYER)
+        return [
+            (user_id, None if isinstance(scores, osu_api.RequestCancelled) else scores)
+            for user_id, scores in zip(user_ids, results)
+        ]
+
+    def _crawl_players(self, user_ids):
+        retrying = self.store.retrying(self.mode, user_ids)
+        if self.use_async:
+            fetched = self._fetch_async(user_ids)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                fetched = list(pool.map(self._fetch, user_ids))
+
+        results = []
+        failed = []
+        for user_id, scores in fetched:
+            if scores is None:
+                continue  # abgebrochen oder Budget aufgebraucht -> bleibt offen für den nächsten Lauf
+            if isinstance(scores, Exception):
+                if _status(scores) != 404:
+                    self.stats["failed"] += 1
+                    failed.append(user_id)
+                    self.log(f"player {user_id}: {scores}")
+                    continue
+                scores = []  # gelöschter/restricted Spieler: als erledigt markieren
+            results.append((user_id, scores))
+
+        with perf.timer("crawler.write_batch"):
+            self.store.write_batch(self.mode, results, failed=failed)
+        self.stats["players"] += len(results)
+        self.stats["scores"] += sum(len(scores) for _, scores in results)
+        self.log(f"crawled {len(results)} players ({self.budget_left()} requests left)")
+        if failed and not results and not retrying:
+            # Nur Fehler bei bisher unversuchten Spielern (API down?) -> nicht endlos wiederholen.
+            # Wiederholt fehlschlagende Spieler regelt der Fehlerzähler im Store.
+            self.stop_event.set()
+
+
+def update_matrix(store, path, mode):
+    """Neu gecrawlte Spieler an die Play-Matrix anhängen (inkrementell)."""
+    if os.path.exists(path):
+        matrix = collaborative.PlayMatrix.load(path)
+    else:
+        matrix = collaborative.PlayMatrix(mode)
+    added = 0
+    for user_id, scores in store.player_scores(mode, skip=set(matrix.user_rows)):
+        matrix.add_player(user_id, scores)
+        added += 1
+    matrix.save(path)
+    return added, matrix.players
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl rankings and best scores into a local corpus.")
+    parser.add_argument("--db", default="corpus.sqlite", help="SQLite corpus file")
+    parser.add_argument("--mode", default=osu_api.MODE_OPTIONS[0], choices=osu_api.MODE_OPTIONS)
+    parser.add_argument("--budget", type=int, default=500, help="max API requests for this run")
+    parser.add_argument("--batch-size", type=int, default=20, help="players per transaction")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent requests")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="fetch each batch with the asyncio client (needs aiohttp); ignores --workers")
+    parser.add_argument("--max-pages", type=int, help="stop after this many ranking pages")
+    parser.add_argument("--requests-per-minute", type=int, help="override the shared rate limit")
+    parser.add_argument("--matrix", help="update this collaborative play matrix file after crawling")
+    parser.add_argument("--token", help="osu! API access token (default: client credentials from config)")
+    parser.add_argument("--config", default=osu_api.CONFIG_FILE)
+    parser.add_argument("--base-url", help="API base URL, e.g. http://127.0.0.1:8090 for mock_server.py")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    config = osu_api.load_config(args.config)
+    if args.requests_per_minute:
+        config["requests_per_minute"] = args.requests_per_minute
+    osu_api.configure(config, base=args.base_url)
+
+    if args.use_async:
+        import async_api
+        if not async_api.available():
+            raise SystemExit("--async needs aiohttp (pip install aiohttp)")
+
+    store = CorpusStore(args.db)
+    stop = threading.Event()
+
+    def on_sigint(signum, frame):
+        # Erstes Ctrl+C: laufenden Batch noch speichern, zweites: sofort beenden
+        if stop.is_set():
+            raise KeyboardInterrupt
+        print("stopping after current batch...", file=sys.stderr)
+        stop.set()
+
+    signal.signal(signal.SIGINT, on_sigint)
+    log = (lambda message: None) if args.quiet else (lambda message: print(f"[crawler] {message}", file=sys.stderr))
+
+    try:
+        if args.budget > 0:
+            try:
+                token = osu_api.resolve_token(args.token, args.config)
+            except ValueError as e:
+                raise SystemExit(str(e))
+            crawler = Crawler(store, token, args.mode, args.budget, args.batch_size, args.workers,
+                              args.max_pages, stop_event=stop, log=log, use_async=args.use_async)
+            print(json.dumps(crawler.run()))
+        if args.matrix:
+            added, total = update_matrix(store, args.matrix, args.mode)
+            log(f"matrix {args.matrix}: +{added} players, {total} total")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Central task executor for the Tk app.
+
+Replaces ad-hoc threading.Thread spawning. The executor has:
+  - a bounded thread pool for I/O (API requests, image download/decode),
+  - a lazily created process pool for CPU work (recommender scoring, pp calculation),
+  - cancellation tokens; submitting a task with the same `key` cancels the previous one
+    (latest wins, e.g. fast mode switching),
+  - backpressure: at most `max_pending` tasks in flight; further submits are rejected,
+  - result/error marshalling: on_done/on_error always run on the Tk thread. Workers only
+    put results into a queue, which the Tk loop drains with after() while tasks are
+    outstanding (no polling when idle).
+
+submit() and cancel() must be called from the Tk thread.
+
+Under a burst of UI actions, the thread count stays at io_workers and queued work
+stays bounded.
+"""
+import os
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import perf
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Busy(Exception):
+    """Zu viele offene Tasks (Backpressure)."""
+
+
+class CancelToken:
+    __slots__ = ("_event",)
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    # passt als `cancelled`-Callback, z.B. für osu_api.low_priority / RateLimiter.acquire
+    def is_set(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout):
+        return self._event.wait(timeout)
+
+
+class _Task:
+    __slots__ = ("name", "key", "token", "on_done", "on_error", "future")
+
+    def __init__(self, name, key, token, on_done, on_error):
+        self.name = name
+        self.key = key
+        self.token = token
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+
+
+class TaskExecutor:
+    POLL_MS = 30
+
+    def __init__(self, root, io_workers=8, cpu_workers=None, max_pending=64, on_error=None):
+        self.root = root
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io")
+        self.cpu_workers = cpu_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._cpu_pool = None
+        self.max_pending = max_pending
+        self.default_on_error = on_error
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._results = queue.SimpleQueue()
+        self._keyed = {}  # key -> laufender _Task (nur im Tk-Thread verändert)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._poll_id = None
+
+    @property
+    def cpu_pool(self):
+        if self._cpu_pool is None:
+            # multiprocessing erst laden, wenn wirklich CPU-Arbeit ansteht (spart Startzeit)
+            from concurrent.futures import ProcessPoolExecutor
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        return self._cpu_pool
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, kind="io", with_token=False, name=None):
+        """`fn(*args)` im I/O-Pool (kind="io") oder Prozess-Pool (kind="cpu") ausführen.
+
+        on_done(result) / on_error(exception) laufen im Tk-Thread, aber nur wenn der Task
+        nicht abgebrochen wurde. Mit `key` ersetzt der Task einen noch laufenden mit gleichem Key.
+        with_token=True übergibt den CancelToken als Keyword `token` (nur kind="io").
+        Liefert den CancelToken oder None, wenn zu viele Tasks offen sind.
+        """
+        if self._closed:
+            return None
+        # Erst Slot holen, dann den alten Task mit gleichem Key abbrechen: wird der neue
+        # abgelehnt, bleibt wenigstens die ältere Anfrage bestehen
+        if not self._slots.acquire(blocking=False):
+            perf.count("executor.rejected")
+            handler = on_error or self.default_on_error
+            if handler:
+                handler(Busy(f"{self._pending} tasks pending"))
+            return None
+        if key is not None:
+            self.cancel(key)
+
+        token = CancelToken()
+        task = _Task(name or getattr(fn, "__name__", "task"), key, token, on_done, on_error)
+        with self._lock:
+            self._pending += 1
+            perf.gauge("executor.pending", self._pending)
+        if key is not None:
+            self._keyed[key] = task
+
+        if kind == "cpu":
+            future = self.cpu_pool.submit(fn, *args)
+        else:
+            future = self.io_pool.submit(self._run, task, fn, args, with_token)
+        task.future = future
+        future.add_done_callback(lambda f: self._finished(task))
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.POLL_MS, self._drain)
+        return token
+
+    def _run(self, task, fn, args, with_token):
+        task.token.raise_if_cancelled()
+        with perf.timer(f"task.{task.name}"):
+            if with_token:
+                return fn(*args, token=task.token)
+            return fn(*args)
+
+    def _finished(self, task):
+        # Läuft im Worker-Thread: nur Ergebnis in die Queue legen und Slot freigeben.
+        # Erst put, dann pending verringern -> _drain hört nicht auf, solange etwas unterwegs ist.
+        self._results.put(task)
+        with self._lock:
+            self._pending -= 1
+            perf.gauge("executor.pending", self._pending)
+        self._slots.release()
+
+    def cancel(self, key):
+        task = self._keyed.pop(key, None)
+        if task is not None:
+            task.token.cancel()
+            if task.future is not None:
+                task.future.cancel()
+            perf.count("executor.cancelled")
+
+    def _drain(self):
+        # Tk-Thread: fertige Tasks abarbeiten und Callbacks ausführen
+        self._poll_id = None
+        try:
+            while True:
+                try:
+                    task = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if task.key is not None and self._keyed.get(task.key) is task:
+                    del self._keyed[task.key]
+                if task.token.cancelled or task.future.cancelled():
+                    continue
+                error = task.future.exception()
+                try:
+                    if error is None:
+                        if task.on_done:
+                            task.on_done(task.future.result())
+                    elif not isinstance(error, Cancelled):
+                        perf.count(f"task.{task.name}.error")
+                        handler = task.on_error or self.default_on_error
+                        if handler:
+                            handler(error)
+                except Exception:
+                    traceback.print_exc()
+        finally:
+            # Nur weiter pollen, solange Tasks laufen (pending vor der Queue prüfen, siehe _finished)
+            if not self._closed and (self._pending > 0 or not self._results.empty()):
+                self._poll_id = self.root.after(self.POLL_MS, self._drain)
+
+    def shutdown(self):
+        self._closed = True
+        for key in list(self._keyed):
+            self.cancel(key)
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
@@ -1,31 +1,37 @@
+import time
+_STARTUP_T0 = time.perf_counter()
+
 import os
+import sys
 import json
-import threading
-import webbrowser
 import tkinter as tk
+from tkinter import messagebox
 import customtkinter as ctk
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from PIL import Image, ImageTk
 from random import randint, choice
-import requests
-import time
-from io import BytesIO
 
-# --- CONFIG ---
-CONFIG_FILE = "config.json"
-REDIRECT_URI = "http://localhost:8080/callback"
-TOKEN_URL = "https://osu.ppy.sh/oauth/token"
-API_ME_URL = "https://osu.ppy.sh/api/v2/me"
-API_USER_BEST_SCORES_URL = "https://osu.ppy.sh/api/v2/users/{user_id}/scores/best"  # Für Best Scores
+import perf
+from executor import TaskExecutor, Busy
+from prefetch import Prefetcher, idle_since
 
-# --- SETUP ---
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("dark-blue")
+# Schwere Module (requests, http.server, webbrowser) werden erst bei Bedarf importiert,
+# damit das Fenster so schnell wie möglich erscheint. PIL lädt customtkinter ohnehin;
+# gespart wird dort nur das Dekodieren des großen Logos (siehe load_logo).
+# Importzeiten messen: python -X importtime main.py --startup-profile
+from osu_api import (
+    CONFIG_FILE, MODE_OPTIONS, authorize_url,
+    exchange_token, get_user_profile, get_user_best_scores, get_players, download_image,
+)
 
 MOD_OPTIONS = ["NM", "HD", "HR", "HDHR", "DT", "HDDT", "HDHRDT", "HT"]
-MODE_OPTIONS = ["osu", "taiko", "fruits", "mania"]
 LANGUAGES = ["English", "Deutsch"]
 
+LOGO_FILE = "osu_logo.png"
+LOGO_SMALL_FILE = "osu_logo_24.png"  # vorverkleinert, wird mit Tk direkt geladen (ohne PIL)
+LOGO_SIZE = (24, 24)
+AVATAR_SIZE = (100, 100)
+COVER_SIZE = (80, 80)
+COVER_CACHE_SIZE = 200
+
 TRANSLATIONS = {
     "English": {
         "username_label": "Username:",
@@ -42,7 +48,17 @@ TRANSLATIONS = {
         "error_login": "Please login first.",
         "error_username": "Username cannot be empty.",
         "scores_title": "Best Scores",
-        "no_scores": "No scores found."
+        "no_scores": "No scores found.",
+        "compare_button": "Compare",
+        "compare_title": "Compare Players",
+        "compare_hint": "Usernames or IDs, separated by commas",
+        "compare_loading": "Loading...",
+        "compare_not_found": "not found",
+        "compare_accuracy": "Accuracy",
+        "compare_playcount": "Play Count",
+        "compare_top_pp": "Top Play PP",
+        "compare_avg_stars": "Avg. Stars (Top)",
+        "compare_common": "Common Top Maps"
     },
     "Deutsch": {
         "username_label": "Benutzername:",
@@ -59,60 +75,25 @@ TRANSLATIONS = {
         "error_login": "Bitte zuerst einloggen.",
         "error_username": "Benutzername darf nicht leer sein.",
         "scores_title": "Beste Scores",
-        "no_scores": "Keine Scores gefunden."
+        "no_scores": "Keine Scores gefunden.",
+        "compare_button": "Vergleichen",
+        "compare_title": "Spieler vergleichen",
+        "compare_hint": "Benutzernamen oder IDs, durch Kommas getrennt",
+        "compare_loading": "Lädt...",
+        "compare_not_found": "nicht gefunden",
+        "compare_accuracy": "Genauigkeit",
+        "compare_playcount": "Spielanzahl",
+        "compare_top_pp": "PP bester Play",
+        "compare_avg_stars": "Ø Sterne (Top)",
+        "compare_common": "Gemeinsame Top Maps"
     }
 }
 
-class OAuthHandler(BaseHTTPRequestHandler):
-    auth_code = None
-    def do_GET(self):
-        if self.path.startswith("/callback?code="):
-            code = self.path.split("code=")[-1].split("&")[0]
-            OAuthHandler.auth_code = code
-            self.send_response(200)
-            self.end_headers()
-            self.wfile.write(b"<html><body><h1>Login successful! You can close this window.</h1></body></html>")
-        else:
-            self.send_error(404)
-
-def start_server():
-    server = HTTPServer(("localhost", 8080), OAuthHandler)
-    return server
-
-def exchange_token(code, client_id, client_secret):
-    data = {
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "code": code,
-        "grant_type": "authorization_code",
-        "redirect_uri": REDIRECT_URI
-    }
-    response = requests.post(TOKEN_URL, json=data)
-    response.raise_for_status()
-    return response.json()
-
-def get_user_profile(token):
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(API_ME_URL, headers=headers)
-    response.raise_for_status()
-    return response.json()
-
-def get_user_best_scores(token, user_id, mode, mods=None):
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {
-        "mode": mode,
-        "limit": 20,
-    }
-    if mods:
-        params["mods"] = mods
-
-    url = API_USER_BEST_SCORES_URL.format(user_id=user_id)
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
-
 class MainApp(ctk.CTk):
     def __init__(self):
+        # Theme erst beim Erstellen des Fensters setzen, nicht beim Import
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
         super().__init__()
         self.title("osu! Viewer")
         self.geometry("1100x700")
@@ -128,6 +109,17 @@ class MainApp(ctk.CTk):
         self.rank_data = []
         self.access_token = None
         self.user_id = None
+        self.prefetcher = None
+        self.last_interaction = time.monotonic()
+        self.score_rows = {}     # score_key -> ScoreRow
+        self.score_order = []    # ScoreRows in Anzeige-Reihenfolge
+        self._cover_images = {}  # Cover-URL -> PhotoImage
+        self._suspend_scrollregion = False
+        self._scrollregion_pending = False
+        self._login_server = None  # OAuth-Callback-Server, solange ein Login offen ist
+
+        # Alle Hintergrundarbeit läuft über den Executor; Ergebnisse/Fehler kommen im Tk-Thread an
+        self.executor = TaskExecutor(self, on_error=self.show_error)
 
         # Hintergrund Canvas
         self.bg_canvas = tk.Canvas(self, bg="#111111", highlightthickness=0)
@@ -138,19 +130,31 @@ class MainApp(ctk.CTk):
         self.ui_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.ui_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
 
+        self.perf_panel = None
+
         self.create_widgets()
         self.animate_background()
 
+        # Debug-Panel mit Timings/Countern (perf.py)
+        self.bind("<F12>", lambda e: self.toggle_perf_panel())
+
+        # Letzte Eingabe merken, damit der Prefetcher pausiert, solange der User aktiv ist
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<MouseWheel>"):
+            self.bind_all(sequence, self._mark_interaction, add="+")
+
     def create_widgets(self):
+        # Fonts einmal anlegen und von allen Score-Zeilen teilen
+        self.fonts = {
+            "heading": ctk.CTkFont(size=18, weight="bold"),
+            "title": ctk.CTkFont(size=14, weight="bold"),
+            "detail": ctk.CTkFont(size=12),
+        }
+
         # Obere Leiste
         top = ctk.CTkFrame(self.ui_frame, fg_color="transparent")
         top.pack(fill="x", padx=10, pady=10)
 
-        try:
-            osu_logo_img = Image.open("osu_logo.png").resize((24, 24))
-            self.osu_logo = ImageTk.PhotoImage(osu_logo_img)
-        except Exception:
-            self.osu_logo = None
+        self.osu_logo = self.load_logo()
 
         self.login_btn = ctk.CTkButton(
             top,
@@ -170,6 +174,10 @@ class MainApp(ctk.CTk):
         self.logged_in_label = ctk.CTkLabel(top, text="", width=150)
         self.logged_in_label.pack(side="left", padx=10)
 
+        self.compare_btn = ctk.CTkButton(top, text=self.translations["compare_button"], width=90, command=self.open_compare)
+        self.compare_btn.pack(side="left", padx=5)
+        self.compare_window = None
+
         self.language_menu = ctk.CTkOptionMenu(top, values=LANGUAGES, variable=self.language, command=self.change_language)
         self.language_menu.pack(side="right", padx=5)
 
@@ -227,7 +235,7 @@ class MainApp(ctk.CTk):
         sep.pack(pady=5)
 
         # Scores Titel
-        self.scores_title_label = ctk.CTkLabel(right, text=self.translations["scores_title"], font=ctk.CTkFont(size=18, weight="bold"))
+        self.scores_title_label = ctk.CTkLabel(right, text=self.translations["scores_title"], font=self.fonts["heading"])
         self.scores_title_label.pack(anchor="w", padx=5, pady=(5,0))
 
         # Scrollbarer Scores Bereich
@@ -241,7 +249,23 @@ class MainApp(ctk.CTk):
         self.scores_inner_frame = ctk.CTkFrame(self.scores_canvas, fg_color="#222")
         self.scores_canvas.create_window((0,0), window=self.scores_inner_frame, anchor="nw")
 
-        self.scores_inner_frame.bind("<Configure>", lambda e: self.scores_canvas.configure(scrollregion=self.scores_canvas.bbox("all")))
+        self.scores_inner_frame.bind("<Configure>", self.update_scrollregion)
+
+        self.no_scores_label = ctk.CTkLabel(self.scores_inner_frame, text=self.translations["no_scores"])
+
+    def load_logo(self):
+        # Das 1024x1024 Original nur dann dekodieren, wenn das kleine Asset fehlt,
+        # und das Ergebnis für den nächsten Start zwischenspeichern.
+        small_path = resource_path(LOGO_SMALL_FILE)
+        try:
+            if not os.path.exists(small_path):
+                from PIL import Image
+                with Image.open(resource_path(LOGO_FILE)) as img:
+                    img.thumbnail(LOGO_SIZE, Image.LANCZOS)
+                    img.save(small_path)
+            return tk.PhotoImage(master=self, file=small_path)
+        except Exception:
+            return None
 
     def select_mod(self, mod):
         self.selected_mod.set(mod)
@@ -257,15 +281,30 @@ class MainApp(ctk.CTk):
     def update_ui_texts(self):
         self.login_btn.configure(text=self.translations["login_button"])
         self.logout_btn.configure(text=self.translations["logout_button"])
+        self.compare_btn.configure(text=self.translations["compare_button"])
         self.mods_label.configure(text=self.translations["mods_select"])
         self.rank_graph_label.configure(text=self.translations["rank_graph_title"])
         self.scores_title_label.configure(text=self.translations["scores_title"])
         # ggf mehr Texte aktualisieren
 
+    def destroy(self):
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+        self.executor.shutdown()
+        self._close_login_server()
+        super().destroy()
+
+    def show_error(self, error, prefix=None):
+        # Nur im Tk-Thread aufrufen (Executor-Callbacks laufen dort)
+        if isinstance(error, Busy):
+            return  # Backpressure, wird in perf als executor.rejected gezählt
+        message = f"{prefix}: {error}" if prefix else str(error)
+        messagebox.showerror("osu! Viewer", message, parent=self)
+
     def start_osu_login(self):
         # Lese ClientID und Secret aus config.json
         if not os.path.exists(CONFIG_FILE):
-            ctk.CTkMessageBox.show_error("Config file missing. Please create config.json with client_id and client_secret.")
+            self.show_error("Config file missing. Please create config.json with client_id and client_secret.")
             return
 
         with open(CONFIG_FILE, "r") as f:
@@ -273,71 +312,108 @@ class MainApp(ctk.CTk):
         client_id = config.get("client_id")
         client_secret = config.get("client_secret")
         if not client_id or not client_secret:
-            ctk.CTkMessageBox.show_error("client_id or client_secret missing in config.json")
+            self.show_error("client_id or client_secret missing in config.json")
             return
 
         # Öffne Auth URL
-        scope = "public"
-        auth_url = f"https://osu.ppy.sh/oauth/authorize?client_id={client_id}&redirect_uri={REDIRECT_URI}&response_type=code&scope={scope}"
+        auth_url = authorize_url(client_id, scope="public")
 
-        # Server starten, um Code zu empfangen
-        server = start_server()
-        threading.Thread(target=server.serve_forever, daemon=True).start()
+        import webbrowser
+        from oauth_server import start_server
+
+        if self._login_server is not None:
+            # Callback-Server läuft schon, nur den Browser erneut öffnen
+            webbrowser.open(auth_url)
+            return
 
+        # Server starten, um Code zu empfangen
+        try:
+            self._login_server = start_server()
+        except OSError as e:
+            self.show_error(e, "Login failed")
+            return
+        token = self.executor.submit(login, self._login_server, client_id, client_secret, key="login",
+                                     with_token=True, on_done=self._on_login, on_error=self._on_login_error)
+        if token is None:
+            # Abgelehnt (Busy): Server wieder freigeben, kein Browser ohne wartenden Callback-Server
+            self._close_login_server()
+            return
         webbrowser.open(auth_url)
 
-        def wait_for_code():
-            while OAuthHandler.auth_code is None:
-                time.sleep(0.5)
-            server.shutdown()
-            try:
-                token_data = exchange_token(OAuthHandler.auth_code, client_id, client_secret)
-                self.access_token = token_data["access_token"]
-                profile = get_user_profile(self.access_token)
-                self.user_id = profile["id"]
-                self.logged_in_label.configure(text=profile["username"])
-                self.load_profile()
-                self.load_scores()
-            except Exception as e:
-                ctk.CTkMessageBox.show_error(f"Login failed: {e}")
-
-        threading.Thread(target=wait_for_code, daemon=True).start()
+    def _close_login_server(self):
+        # wait_for_code schließt den Server nur, wenn der Login-Task tatsächlich läuft;
+        # abgelehnte oder vor dem Start abgebrochene Tasks würden Port 8080 sonst belegt lassen
+        if self._login_server is not None:
+            self._login_server.server_close()
+            self._login_server = None
+
+    def _on_login(self, result):
+        self._close_login_server()
+        self.access_token, profile = result
+        self.user_id = profile["id"]
+        self.logged_in_label.configure(text=profile["username"])
+        self.load_profile()
+        self.load_scores()
+
+    def _on_login_error(self, error):
+        self._close_login_server()
+        self.show_error(error, "Login failed")
+
+    def _mark_interaction(self, event=None):
+        self.last_interaction = time.monotonic()
+
+    def start_prefetch(self):
+        # Nach jedem gerenderten View die anderen Modi im Hintergrund (wieder) vorladen, damit
+        # auch nach Ablauf von PROFILE_TTL/SCORES_TTL der nächste Moduswechsel aus dem Cache kommt
+        if not self.access_token:
+            return
+        if self.prefetcher is None:
+            self.prefetcher = Prefetcher(self.access_token, self.user_id, idle_since(lambda: self.last_interaction))
+        self.prefetcher.start(self.mode.get(), executor=self.executor)
 
     def logout(self):
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
+        # Noch laufende Ergebnisse verwerfen, damit sie die leere Ansicht nicht wieder füllen
+        for key in ("login", "profile", "scores", "covers"):
+            self.executor.cancel(key)
+        self._close_login_server()
         self.access_token = None
         self.user_id = None
         self.logged_in_label.configure(text="")
         self.avatar_label.configure(image=None, text="")
         self.stats_label.configure(text="")
-        for widget in self.scores_inner_frame.winfo_children():
-            widget.destroy()
+        self.clear_scores()
         self.graph_canvas.delete("all")
 
     def load_profile(self):
         if not self.access_token:
             return
-        try:
-            profile = get_user_profile(self.access_token)
-            avatar_url = profile.get("avatar_url") or profile.get("avatar_url")
-            avatar_img = self.load_image_from_url(avatar_url, (100, 100)) if avatar_url else None
-            if avatar_img:
-                self.avatar_label.configure(image=avatar_img, text="")
-                self.avatar_label.image = avatar_img
-            else:
-                self.avatar_label.configure(image=None, text="No Avatar")
+        # key: bei schnellem Moduswechsel gewinnt nur die letzte Anfrage
+        self.executor.submit(fetch_profile, self.access_token, self.mode.get(), key="profile",
+                             on_done=self._show_profile,
+                             on_error=lambda e: self.show_error(e, "Failed to load profile"))
+
+    def _show_profile(self, result):
+        profile, avatar = result
+        avatar_img = to_photo(avatar)
+        if avatar_img:
+            self.avatar_label.configure(image=avatar_img, text="")
+            self.avatar_label.image = avatar_img
+        else:
+            self.avatar_label.configure(image=None, text="No Avatar")
 
-            level = profile.get("statistics", {}).get("level", 0)
-            pp = profile.get("statistics", {}).get("pp", 0)
-            global_rank = profile.get("statistics", {}).get("global_rank", 0)
+        level = profile.get("statistics", {}).get("level", 0)
+        pp = profile.get("statistics", {}).get("pp", 0)
+        global_rank = profile.get("statistics", {}).get("global_rank", 0)
 
-            stats_text = (
-                f"{self.translations['level_text']}: {level}\n"
-                f"{self.translations['pp_text']}: {pp}\n"
-                f"{self.translations['rank_text']}: #{global_rank if global_rank else 'N/A'}"
-            )
-            self.stats_label.configure(text=stats_text)
-        except Exception as e:
-            ctk.CTkMessageBox.show_error(f"Failed to load profile: {e}")
+        stats_text = (
+            f"{self.translations['level_text']}: {level}\n"
+            f"{self.translations['pp_text']}: {pp}\n"
+            f"{self.translations['rank_text']}: #{global_rank if global_rank else 'N/A'}"
+        )
+        self.stats_label.configure(text=stats_text)
 
     def load_scores(self):
         if not self.access_token or not self.user_id:
@@ -351,86 +427,102 @@ class MainApp(ctk.CTk):
         if mod != "NM":
             modstr = mod
 
-        def fetch_scores():
-            try:
-                scores = get_user_best_scores(self.access_token, self.user_id, mode)
-                self.display_scores(scores)
-            except Exception as e:
-                ctk.CTkMessageBox.show_error(f"Failed to load scores: {e}")
-
-        threading.Thread(target=fetch_scores, daemon=True).start()
-
-    def display_scores(self, scores):
-        # Aufruf aus Thread -> im Hauptthread ausführen
-        self.after(0, self._display_scores_ui, scores)
+        self.executor.submit(get_user_best_scores, self.access_token, self.user_id, mode, key="scores",
+                             on_done=self._display_scores_ui,
+                             on_error=lambda e: self.show_error(e, "Failed to load scores"))
 
     def _display_scores_ui(self, scores):
-        for widget in self.scores_inner_frame.winfo_children():
-            widget.destroy()
-
-        if not scores:
-            label = ctk.CTkLabel(self.scores_inner_frame, text=self.translations["no_scores"])
-            label.pack()
-            return
-
-        for score in scores:
-            frame = ctk.CTkFrame(self.scores_inner_frame, fg_color="#333", height=100)
-            frame.pack(fill="x", pady=5, padx=5)
-
-            # Beatmap Cover laden (klein)
-            beatmapset = score.get("beatmapset", {})
-            cover_url = beatmapset.get("covers", {}).get("cover") or beatmapset.get("covers", {}).get("list")
-            cover_img = self.load_image_from_url(cover_url, (80, 80)) if cover_url else None
-
-            if cover_img:
-                cover_label = ctk.CTkLabel(frame, image=cover_img)
-                cover_label.image = cover_img
-                cover_label.pack(side="left", padx=5, pady=5)
-            else:
-                cover_label = ctk.CTkLabel(frame, text="No Image", width=10)
-                cover_label.pack(side="left", padx=5, pady=5)
-
-            info_frame = ctk.CTkFrame(frame, fg_color="transparent")
-            info_frame.pack(side="left", fill="both", expand=True, padx=5)
-
-            title = beatmapset.get("title", "Unknown Title")
-            artist = beatmapset.get("artist", "Unknown Artist")
-            difficulty = score.get("beatmap", {}).get("version", "Unknown")
-            length = score.get("beatmap", {}).get("total_length", 0)
-            stars = score.get("beatmap", {}).get("difficulty_rating", 0)
-            mods = score.get("mods", [])
-            pp = score.get("pp", 0)
-            rank = score.get("rank", "?")
-            score_value = score.get("score", 0)
-            date = score.get("created_at", "").split("T")[0]
-
-            # Titel
-            title_label = ctk.CTkLabel(info_frame, text=f"{artist} - {title} [{difficulty}]", font=ctk.CTkFont(size=14, weight="bold"))
-            title_label.pack(anchor="w")
-
-            # Details
-            detail_text = (
-                f"Length: {length//60}:{length%60:02d} min  "
-                f"Stars: {stars:.2f}  "
-                f"PP: {pp:.1f}  "
-                f"Rank: {rank}  "
-                f"Mods: {''.join(mods) if mods else 'NM'}  "
-                f"Score: {score_value}  "
-                f"Date: {date}"
-            )
-            detail_label = ctk.CTkLabel(info_frame, text=detail_text, font=ctk.CTkFont(size=12))
-            detail_label.pack(anchor="w")
-
-    def load_image_from_url(self, url, size):
+        with perf.timer("ui.display_scores"):
+            self._build_score_rows(scores)
+        self.load_covers()
+        self.start_prefetch()
+
+    def _build_score_rows(self, scores):
+        # Vorhandene Zeilen per Score-ID wiederverwenden und nur geänderte aktualisieren,
+        # statt bei jedem Refresh alle Widgets zu zerstören und neu zu bauen.
+        self._suspend_scrollregion = True
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            img_data = response.content
-            image = Image.open(BytesIO(img_data))
-            image = image.resize(size, Image.LANCZOS)
-            return ImageTk.PhotoImage(image)
-        except Exception:
-            return None
+            keys = [score_key(score) for score in scores]
+            wanted = set(keys)
+            spare = [row for key, row in self.score_rows.items() if key not in wanted]
+            rows = {}
+            for key, score in zip(keys, scores):
+                row = self.score_rows.get(key)
+                if row is None:
+                    row = spare.pop(0) if spare else ScoreRow(self.scores_inner_frame, self.fonts)
+                    perf.count("ui.score_row.created" if row.key is None else "ui.score_row.reused")
+                row_start = time.perf_counter()
+                if row.show(key, score, self.cached_cover):
+                    perf.record("ui.score_row", time.perf_counter() - row_start)
+                rows[key] = row
+            for row in spare:
+                row.destroy()
+
+            # Nur neu packen, wenn sich die Reihenfolge geändert hat
+            order = [rows[key] for key in keys]
+            if order != self.score_order:
+                kept = set(map(id, order))
+                for row in self.score_order:
+                    if id(row) in kept:
+                        row.frame.pack_forget()
+                for row in order:
+                    row.frame.pack(fill="x", pady=5, padx=5)
+            self.score_rows, self.score_order = rows, order
+
+            if scores:
+                self.no_scores_label.pack_forget()
+            else:
+                self.no_scores_label.configure(text=self.translations["no_scores"])
+                self.no_scores_label.pack()
+        finally:
+            self._suspend_scrollregion = False
+        self.update_scrollregion()
+
+    def clear_scores(self):
+        for row in self.score_order:
+            row.destroy()
+        self.score_rows, self.score_order = {}, []
+        self.no_scores_label.pack_forget()
+        self.update_scrollregion()
+
+    def update_scrollregion(self, event=None):
+        # Während eines Batches nicht bei jedem eingefügten Widget neu berechnen
+        if self._suspend_scrollregion or self._scrollregion_pending:
+            return
+        self._scrollregion_pending = True
+        self.after_idle(self._apply_scrollregion)
+
+    def _apply_scrollregion(self):
+        self._scrollregion_pending = False
+        self.scores_canvas.configure(scrollregion=self.scores_canvas.bbox("all"))
+
+    def cached_cover(self, url):
+        # Dekodierte Cover werden pro URL wiederverwendet (max. COVER_CACHE_SIZE Stück);
+        # fehlende lädt load_covers() im Hintergrund nach
+        image = self._cover_images.get(url)
+        perf.cache("cover_photo", image is not None)
+        return image
+
+    def load_covers(self):
+        missing = list(dict.fromkeys(
+            row.cover_url for row in self.score_order
+            if row.cover_url and row.cover_url not in self._cover_images
+        ))
+        if missing:
+            self.executor.submit(fetch_images, missing, COVER_SIZE, key="covers", on_done=self._show_covers)
+
+    def _show_covers(self, images):
+        for url, image in images.items():
+            photo = to_photo(image)
+            if photo is None:
+                continue
+            if len(self._cover_images) >= COVER_CACHE_SIZE:
+                self._cover_images.pop(next(iter(self._cover_images)))
+            self._cover_images[url] = photo
+        for row in self.score_order:
+            photo = self._cover_images.get(row.cover_url)
+            if photo is not None and row.cover_label.image is not photo:
+                row.set_cover(photo)
 
     def animate_background(self):
         self.bg_canvas.delete("all")
@@ -444,6 +536,22 @@ class MainApp(ctk.CTk):
             self.bg_canvas.create_oval(x-r, y-r, x+r, y+r, fill=color, outline="")
         self.after(2000, self.animate_background)
 
+    def open_compare(self):
+        if not self.access_token:
+            messagebox.showerror("osu! Viewer", self.translations["error_login"], parent=self)
+            return
+        if self.compare_window is not None and self.compare_window.winfo_exists():
+            self.compare_window.focus()
+        else:
+            self.compare_window = CompareWindow(self)
+
+    def toggle_perf_panel(self):
+        if self.perf_panel is not None and self.perf_panel.winfo_exists():
+            self.perf_panel.destroy()
+            self.perf_panel = None
+        else:
+            self.perf_panel = PerfPanel(self)
+
     def on_graph_hover(self, event):
         # Beispiel Tooltip - hier könntest du Datenpunkte aus rank_data anzeigen
         if self.rank_data:
@@ -456,6 +564,246 @@ class MainApp(ctk.CTk):
             self.tooltip.place_forget()
 
 
+def fetch_image(url, size):
+    """Download, Dekodieren und Skalieren im Worker-Thread; das PhotoImage erzeugt to_photo() im Tk-Thread."""
+    try:
+        from io import BytesIO
+        from PIL import Image
+        img_data = download_image(url)
+        with perf.timer("image.decode"):
+            image = Image.open(BytesIO(img_data))
+            return image.resize(size, Image.LANCZOS)
+    except Exception:
+        perf.count("image.error")
+        return None
+
+
+def fetch_images(urls, size):
+    return {url: fetch_image(url, size) for url in urls}
+
+
+def to_photo(image):
+    if image is None:
+        return None
+    from PIL import ImageTk
+    return ImageTk.PhotoImage(image)
+
+
+def fetch_players(token, users, mode):
+    # Mit aiohttp laufen alle Spieler auf einem Event Loop statt mit je einem Thread
+    import async_api
+    if async_api.available():
+        return async_api.sync_client().run("get_players", token, users, mode)
+    return get_players(token, users, mode)
+
+
+def fetch_profile(token, mode):
+    profile = get_user_profile(token, mode)
+    avatar_url = profile.get("avatar_url")
+    return profile, fetch_image(avatar_url, AVATAR_SIZE) if avatar_url else None
+
+
+def login(server, client_id, client_secret, token):
+    # Läuft im Executor: auf den OAuth-Callback warten (abbrechbar), dann Token + Profil holen
+    from oauth_server import wait_for_code
+    code = wait_for_code(server, cancelled=token.is_set)
+    token.raise_if_cancelled()
+    access_token = exchange_token(code, client_id, client_secret)["access_token"]
+    return access_token, get_user_profile(access_token)
+
+
+def score_key(score):
+    return score.id or (score.beatmap.id, score.mods, score.extra_mods)
+
+
+class ScoreRow:
+    """Eine Zeile der Score-Liste. Wird bei Refreshes wiederverwendet; show() ändert nur,
+    was sich tatsächlich geändert hat."""
+
+    def __init__(self, parent, fonts):
+        self.key = None
+        self.cover_url = None
+        self.texts = (None, None)
+        self.frame = ctk.CTkFrame(parent, fg_color="#333", height=100)
+        self.cover_label = ctk.CTkLabel(self.frame, text="No Image", width=10)
+        self.cover_label.image = None
+        self.cover_label.pack(side="left", padx=5, pady=5)
+        info_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        info_frame.pack(side="left", fill="both", expand=True, padx=5)
+        self.title_label = ctk.CTkLabel(info_frame, text="", font=fonts["title"])
+        self.title_label.pack(anchor="w")
+        self.detail_label = ctk.CTkLabel(info_frame, text="", font=fonts["detail"])
+        self.detail_label.pack(anchor="w")
+
+    @staticmethod
+    def format(score):
+        beatmap = score.beatmap
+        title = beatmap.title or "Unknown Title"
+        artist = beatmap.artist or "Unknown Artist"
+        difficulty = beatmap.version or "Unknown"
+        length = beatmap.total_length
+        detail_text = (
+            f"Length: {length//60}:{length%60:02d} min  "
+            f"Stars: {beatmap.difficulty_rating:.2f}  "
+            f"PP: {score.pp:.1f}  "
+            f"Rank: {score.rank or '?'}  "
+            f"Mods: {score.mods_string}  "
+            f"Score: {score.score}  "
+            f"Date: {score.date}"
+        )
+        return f"{artist} - {title} [{difficulty}]", detail_text
+
+    def show(self, key, score, load_cover):
+        """Zeile auf `score` setzen. Liefert True, wenn sich etwas geändert hat."""
+        changed = False
+        texts = self.format(score)
+        if texts != self.texts:
+            if texts[0] != self.texts[0]:
+                self.title_label.configure(text=texts[0])
+            if texts[1] != self.texts[1]:
+                self.detail_label.configure(text=texts[1])
+            self.texts = texts
+            changed = True
+
+        cover_url = score.beatmap.cover_url
+        if cover_url != self.cover_url:
+            self.set_cover(load_cover(cover_url) if cover_url else None)
+            self.cover_url = cover_url
+            changed = True
+        self.key = key
+        return changed
+
+    def set_cover(self, cover_img):
+        if cover_img:
+            self.cover_label.configure(image=cover_img, text="")
+        else:
+            self.cover_label.configure(image=None, text="No Image")
+        self.cover_label.image = cover_img
+
+    def destroy(self):
+        self.frame.destroy()
+
+
+class CompareWindow(ctk.CTkToplevel):
+    # Mehrere Spieler nebeneinander; lädt alle Profile + Best Scores parallel
+    # (osu_api.get_players), Cache wird mit der Hauptansicht geteilt.
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.t = app.translations
+        self.title(self.t["compare_title"])
+        self.geometry("900x420")
+
+        bar = ctk.CTkFrame(self, fg_color="transparent")
+        bar.pack(fill="x", padx=10, pady=10)
+        ctk.CTkLabel(bar, text=self.t["username_label"]).pack(side="left")
+        entry = ctk.CTkEntry(bar, textvariable=app.username, placeholder_text=self.t["compare_hint"], width=450)
+        entry.pack(side="left", padx=5)
+        entry.bind("<Return>", lambda e: self.search())
+        ctk.CTkButton(bar, text=self.t["compare_button"], width=90, command=self.search).pack(side="left", padx=5)
+
+        self.table = ctk.CTkScrollableFrame(self, orientation="horizontal")
+        self.table.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.status = ctk.CTkLabel(self, text=self.t["compare_hint"])
+        self.status.pack(pady=(0, 10))
+
+    def search(self):
+        users = [u.strip() for u in self.app.username.get().replace(";", ",").split(",") if u.strip()]
+        if not users:
+            self.status.configure(text=self.t["error_username"])
+            return
+        # Der eingeloggte Spieler steht immer in der ersten Spalte
+        if self.app.user_id and str(self.app.user_id) not in users:
+            users.insert(0, str(self.app.user_id))
+        token, mode = self.app.access_token, self.app.mode.get()
+        self.status.configure(text=self.t["compare_loading"])
+        self.app.executor.submit(fetch_players, token, users, mode, key="compare", name="compare_fetch",
+                                 on_done=lambda results: self.show(users, results))
+
+    def show(self, users, results):
+        if not self.winfo_exists():
+            return
+        for widget in self.table.winfo_children():
+            widget.destroy()
+
+        own_id = str(self.app.user_id)
+        own = results[users.index(own_id)] if own_id in users else None
+        own_maps = {s.beatmap.id for s in own[1]} if own and not isinstance(own, Exception) else set()
+        rows = [
+            ("", lambda p, s: p["username"]),
+            (self.t["rank_text"], lambda p, s: f"#{p['statistics'].get('global_rank') or 'N/A'}"),
+            (self.t["pp_text"], lambda p, s: f"{p['statistics'].get('pp', 0):.0f}"),
+            (self.t["compare_accuracy"], lambda p, s: f"{p['statistics'].get('hit_accuracy', 0):.2f}%"),
+            (self.t["compare_playcount"], lambda p, s: f"{p['statistics'].get('play_count', 0)}"),
+            (self.t["compare_top_pp"], lambda p, s: f"{s[0].pp:.0f}" if s else "-"),
+            (self.t["compare_avg_stars"], lambda p, s: f"{sum(x.beatmap.difficulty_rating for x in s) / len(s):.2f}" if s else "-"),
+            (self.t["compare_common"], lambda p, s: str(len(own_maps & {x.beatmap.id for x in s}))),
+        ]
+        bold = ctk.CTkFont(size=13, weight="bold")
+        for r, (label, _) in enumerate(rows):
+            ctk.CTkLabel(self.table, text=label, font=bold, anchor="w").grid(row=r, column=0, sticky="w", padx=8, pady=2)
+        for c, (user, result) in enumerate(zip(users, results), start=1):
+            if isinstance(result, Exception):
+                ctk.CTkLabel(self.table, text=f"{user}: {self.t['compare_not_found']}").grid(row=0, column=c, padx=12)
+                continue
+            profile, scores = result
+            for r, (_, value) in enumerate(rows):
+                ctk.CTkLabel(self.table, text=value(profile, scores), font=bold if r == 0 else None).grid(row=r, column=c, padx=12, pady=2)
+        self.status.configure(text="")
+
+
+class PerfPanel(ctk.CTkToplevel):
+    # Zeigt perf.snapshot() an, aktualisiert sich jede Sekunde solange offen (F12)
+    REFRESH_MS = 1000
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Performance")
+        self.geometry("620x520")
+
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        buttons.pack(fill="x", padx=10, pady=(10, 0))
+        ctk.CTkButton(buttons, text="Export JSON", width=110, command=self.export).pack(side="left", padx=(0, 5))
+        ctk.CTkButton(buttons, text="Reset", width=80, command=perf.reset).pack(side="left")
+
+        self.text = ctk.CTkTextbox(self, font=ctk.CTkFont(family="Courier", size=12), wrap="none")
+        self.text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh()
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", perf.format_snapshot())
+        self.text.configure(state="disabled")
+        self.after(self.REFRESH_MS, self.refresh)
+
+    def export(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json", initialfile="perf.json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            perf.export_json(path)
+
+
+def resource_path(name):
+    # PyInstaller entpackt Daten nach sys._MEIPASS, sonst neben main.py
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, name)
+
+
+def report_startup(app, exit_after=False):
+    # Zeit bis zum ersten gezeichneten Fenster
+    app.update_idletasks()
+    elapsed = (time.perf_counter() - _STARTUP_T0) * 1000
+    print(f"[startup] first paint after {elapsed:.0f} ms", file=sys.stderr)
+    if exit_after:
+        app.destroy()
+
+
 if __name__ == "__main__":
     app = MainApp()
+    if "--startup-profile" in sys.argv:
+        app.after_idle(report_startup, app, True)
     app.mainloop()
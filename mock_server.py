@@ -0,0 +1,438 @@
+"""Local stand-in for the osu! API and image CDN, for offline load tests and benchmarks.
+
+Serves the OAuth token/authorize endpoints, /me, /users/{user}/{mode}, best scores,
+performance rankings, beatmap lookup and cover/avatar images.
+Responses are built from the recorded templates in fixtures/ (score.json, user.json,
+cover.jpg); files in fixtures/users/<id>.json and fixtures/scores/<id>_<mode>.json are
+served verbatim when present. Other users get deterministic synthetic top plays drawn
+from a shared beatmap pool, so different players overlap on the same maps.
+
+    python mock_server.py --port 8090 --latency-ms 80 --jitter-ms 40 --rate-429 0.05
+    python cli.py 1 2 3 --base-url http://127.0.0.1:8090 --token mock
+
+or in-process:
+
+    server = MockOsuServer(latency_ms=50).start()
+    osu_api.configure(base=server.base_url)
+    ...
+    server.stop()
+
+GET /_mock/stats returns request counts per endpoint.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MOCK_TOKEN = "mock-access-token"
+DEFAULT_USER_ID = 7562902
+
+MODES = ("osu", "taiko", "fruits", "mania")
+MOD_COMBOS = [[], [], ["HD"], ["HD"], ["HR"], ["HD", "HR"], ["DT"], ["HD", "DT"], ["HD", "DT"], ["HD", "HR", "DT"]]
+ARTISTS = ["xi", "camellia", "DragonForce", "Yooh", "Team Grimoire", "Feryquitous", "Kola Kid", "sakuzyo",
+           "Halozy", "nekodex", "t+pazolite", "Laur", "Kurokotei", "Hommarju", "LeaF", "Silentroom"]
+TITLES = ["Blue Zenith", "Ascension", "Through the Fire", "Ariadne", "Caliburne", "Tempest", "Aether",
+          "Imprinting", "Galaxy Collapse", "Freedom Dive", "Harumachi", "Night Sky", "Glory Days",
+          "Chronostasis", "Sidetracked Day", "Kimi no Bouken"]
+MAPPERS = ["Sotarks", "Monstrata", "Shiirn", "Sing", "Mir", "Kroytz", "fieryrage", "Log Off Now",
+           "Kite", "eiri-", "Asphyxia", "Nevo", "Akitoshi", "pishifat", "Shmiklak", "Cheri"]
+VERSIONS = ["Normal", "Hard", "Insane", "Extra", "Extreme", "Expert", "Another", "Master"]
+RANKING_PAGE_SIZE = 50
+RANKING_FIRST_USER_ID = 100000  # Platz n in der Rangliste = User-ID 100000 + n
+
+
+class FixtureData:
+    """Erzeugt API-Antworten aus den Templates in fixtures/ (deterministisch pro Seed)."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, beatmap_pool=2000, seed=0, ranking_pages=200):
+        self.fixtures_dir = fixtures_dir
+        self.seed = seed
+        self.ranking_pages = ranking_pages
+        with open(os.path.join(fixtures_dir, "score.json"), "r", encoding="utf-8") as f:
+            self.score_template = json.load(f)
+        with open(os.path.join(fixtures_dir, "user.json"), "r", encoding="utf-8") as f:
+            self.user_template = json.load(f)
+        with open(os.path.join(fixtures_dir, "cover.jpg"), "rb") as f:
+            self.cover = f.read()
+        self.beatmaps = [self._make_beatmap(i) for i in range(beatmap_pool)]
+        self.beatmaps_by_stars = sorted(self.beatmaps, key=lambda b: b["beatmap"]["difficulty_rating"])
+        self._scores = {}
+        self._lock = threading.Lock()
+
+    def _recorded(self, *parts):
+        path = os.path.join(self.fixtures_dir, *parts)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return None
+
+    def _make_beatmap(self, i):
+        rng = random.Random(self.seed * 1000003 + i)
+        stars = round(1.5 + 7.0 * rng.random() ** 0.9, 2)
+        set_id = 500000 + i // 3
+        beatmap = copy.deepcopy(self.score_template["beatmap"])
+        beatmapset = copy.deepcopy(self.score_template["beatmapset"])
+        beatmap.update({
+            "id": 1000000 + i,
+            "beatmapset_id": set_id,
+            "difficulty_rating": stars,
+            "version": VERSIONS[min(int(stars), len(VERSIONS) - 1)],
+            "ar": round(min(10.0, 5.5 + stars * 0.55 + rng.uniform(-0.5, 0.5)), 1),
+            "accuracy": round(min(10.0, 5.0 + stars * 0.5 + rng.uniform(-0.5, 0.5)), 1),
+            "cs": round(rng.uniform(3.0, 5.0), 1),
+            "drain": round(rng.uniform(4.0, 7.0), 1),
+            "bpm": rng.choice([140, 150, 160, 170, 175, 180, 185, 190, 200, 210, 220, 230, 240, 260]),
+            "total_length": rng.randint(60, 360),
+            "url": f"https://osu.ppy.sh/beatmaps/{1000000 + i}",
+        })
+        beatmap["hit_length"] = beatmap["total_length"] - 3
+        beatmapset.update({
+            "id": set_id,
+            "artist": ARTISTS[rng.randrange(len(ARTISTS))],
+            "title": f"{TITLES[rng.randrange(len(TITLES))]} {set_id % 97}",
+            "creator": MAPPERS[rng.randrange(len(MAPPERS))],
+            "covers": {key: f"{{base}}/covers/{set_id}/{key}.jpg" for key in beatmapset["covers"]},
+        })
+        beatmapset["artist_unicode"] = beatmapset["artist"]
+        beatmapset["title_unicode"] = beatmapset["title"]
+        return {"beatmap": beatmap, "beatmapset": beatmapset}
+
+    def user(self, user_id, mode=None):
+        recorded = self._recorded("users", f"{user_id}.json")
+        if recorded is not None:
+            return recorded
+        rng = random.Random(f"user-{self.seed}-{user_id}")
+        user = copy.deepcopy(self.user_template)
+        rank = rng.randint(1, 200000)
+        stats = user["statistics"]
+        stats.update({
+            "global_rank": rank,
+            "country_rank": max(1, rank // 25),
+            "pp": round(20000 / (1 + rank / 3000) + rng.uniform(0, 300), 2),
+            "hit_accuracy": round(rng.uniform(94.0, 99.5), 2),
+            "play_count": rng.randint(1000, 150000),
+            "level": {"current": rng.randint(80, 110), "progress": rng.randint(0, 99)},
+        })
+        user.update({
+            "id": int(user_id),
+            "username": f"Player{user_id}",
+            "avatar_url": f"{{base}}/avatars/{user_id}.jpg",
+            "playmode": mode or "osu",
+            "rank_history": {"mode": mode or "osu", "data": [rank + 30 * d for d in range(89, -1, -1)]},
+        })
+        return user
+
+    def beatmap(self, beatmap_id):
+        index = int(beatmap_id) - 1000000
+        if not 0 <= index < len(self.beatmaps):
+            return None
+        entry = self.beatmaps[index]
+        return dict(entry["beatmap"], beatmapset=entry["beatmapset"])
+
+    def rankings(self, mode, page):
+        if not 1 <= page <= self.ranking_pages:
+            return []
+        entries = []
+        for n in range((page - 1) * RANKING_PAGE_SIZE + 1, page * RANKING_PAGE_SIZE + 1):
+            user_id = RANKING_FIRST_USER_ID + n
+            entries.append({
+                "global_rank": n,
+                "pp": round(30000 / (1 + n / 2000), 2),
+                "hit_accuracy": 98.5,
+                "play_count": 50000,
+                "is_ranked": True,
+                "user": {"id": user_id, "username": f"Player{user_id}", "country_code": "DE",
+                         "avatar_url": f"{{base}}/avatars/{user_id}.jpg"},
+            })
+        return entries
+
+    def best_scores(self, user_id, mode):
+        recorded = self._recorded("scores", f"{user_id}_{mode}.json")
+        if recorded is not None:
+            return recorded
+        key = (int(user_id), mode)
+        with self._lock:
+            scores = self._scores.get(key)
+            if scores is None:
+                scores = self._scores[key] = self._make_scores(int(user_id), mode)
+        return scores
+
+    def _make_scores(self, user_id, mode, count=100):
+        # Spieler haben ein "Skill-Level"; die Top Plays liegen in der Nähe davon,
+        # dadurch teilen sich ähnliche Spieler viele Beatmaps (wie im echten Spiel).
+        rng = random.Random(f"scores-{self.seed}-{user_id}-{mode}")
+        skill = rng.uniform(3.5, 8.0)
+        nearby = [b for b in self.beatmaps_by_stars if abs(b["beatmap"]["difficulty_rating"] - skill) < 1.0]
+        if len(nearby) < count:
+            nearby = self.beatmaps_by_stars
+        picked = rng.sample(nearby, min(count, len(nearby)))
+        scores = []
+        for n, entry in enumerate(picked):
+            stars = entry["beatmap"]["difficulty_rating"]
+            mods = rng.choice(MOD_COMBOS)
+            accuracy = rng.uniform(0.93, 1.0)
+            pp = 25 * stars ** 1.8 * accuracy ** 8 * (1.35 if "DT" in mods else 1.0) * (1.08 if "HR" in mods else 1.0)
+            score = copy.copy(self.score_template)
+            score.update({
+                "id": user_id * 1000 + n,
+                "best_id": user_id * 1000 + n,
+                "user_id": user_id,
+                "mode": mode,
+                "mods": mods,
+                "accuracy": round(accuracy, 4),
+                "pp": round(pp, 3),
+                "rank": "X" if accuracy > 0.995 else "S" if accuracy > 0.97 else "A",
+                "score": int(1000000 * stars * accuracy * 5),
+                "max_combo": rng.randint(300, 2500),
+                "created_at": f"20{rng.randint(18, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+                "beatmap": dict(entry["beatmap"], mode=mode),
+                "beatmapset": entry["beatmapset"],
+                "user": dict(self.score_template["user"], id=user_id, username=f"Player{user_id}",
+                             avatar_url=f"{{base}}/avatars/{user_id}.jpg"),
+            })
+            scores.append(score)
+        scores.sort(key=lambda s: s["pp"], reverse=True)
+        for n, score in enumerate(scores):
+            score["weight"] = {"percentage": round(100 * 0.95 ** n, 3), "pp": round(score["pp"] * 0.95 ** n, 3)}
+        return scores
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-Alive, damit Connection-Pooling messbar ist
+    disable_nagle_algorithm = True  # sonst 40 ms Delayed-ACK-Pause zwischen Header und Body
+
+    ROUTES = [
+        ("GET", re.compile(r"^/oauth/authorize$"), "authorize"),
+        ("POST", re.compile(r"^/oauth/token$"), "token"),
+        ("GET", re.compile(r"^/api/v2/me(?:/(?P<mode>\w+))?$"), "me"),
+        ("GET", re.compile(r"^/api/v2/users/(?P<user_id>\d+)/scores/best$"), "best_scores"),
+        ("GET", re.compile(r"^/api/v2/users/(?P<user>[^/]+)(?:/(?P<mode>\w+))?$"), "user"),
+        ("GET", re.compile(r"^/api/v2/rankings/(?P<mode>\w+)/performance$"), "rankings"),
+        ("GET", re.compile(r"^/api/v2/beatmaps/(?P<beatmap_id>\d+)$"), "beatmap"),
+        ("GET", re.compile(r"^/covers/(?P<set_id>\d+)/[\w@]+\.jpg$"), "image"),
+        ("GET", re.compile(r"^/avatars/(?P<user_id>\d+)\.jpg$"), "image"),
+        ("GET", re.compile(r"^/_mock/stats$"), "stats"),
+    ]
+    AUTHENTICATED = {"me", "user", "best_scores", "rankings", "beatmap"}
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        if self.server.mock.verbose:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method):
+        mock = self.server.mock
+        parsed = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        for route_method, pattern, name in self.ROUTES:
+            match = pattern.match(parsed.path)
+            if route_method == method and match:
+                break
+        else:
+            return self._send_json(404, {"error": "not found"})
+
+        if name == "stats":
+            return self._send_json(200, mock.stats())
+        mock.count(name)
+
+        fault = mock.inject_fault()
+        if fault:
+            status, headers = fault
+            return self._send_json(status, {"error": "injected"}, headers)
+
+        auth = self.headers.get("Authorization", "")
+        if name in self.AUTHENTICATED and not (
+                auth.startswith("Bearer ") and (mock.accept_any_token or auth == f"Bearer {MOCK_TOKEN}")):
+            return self._send_json(401, {"authentication": "basic"})
+
+        handler = getattr(self, f"_handle_{name}")
+        handler(match.groupdict(), {k: v[-1] for k, v in parse_qs(parsed.query).items()})
+
+    def _base(self):
+        return f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]}"
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).replace("{base}", self._base()).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle_authorize(self, groups, query):
+        # Direkt zurück zum Callback der App, wie nach einem erfolgreichen Login
+        self.send_response(302)
+        self.send_header("Location", f"{query.get('redirect_uri', '')}?code=mock-code")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _handle_token(self, groups, query):
+        self._send_json(200, {"token_type": "Bearer", "expires_in": 86400, "access_token": MOCK_TOKEN})
+
+    def _handle_me(self, groups, query):
+        self._send_json(200, self.server.mock.data.user(self.server.mock.me_id, groups.get("mode")))
+
+    def _handle_user(self, groups, query):
+        # Synthetische Spieler heißen "Player<id>"; key=username|id wie bei der echten API
+        user = unquote(groups["user"])
+        if query.get("key") == "username" or not user.isdigit():
+            match = re.fullmatch(r"player(\d+)", user.lower().lstrip("@"))
+            if not match:
+                return self._send_json(404, {"error": None})
+            user = match.group(1)
+        self._send_json(200, self.server.mock.data.user(user, groups.get("mode")))
+
+    def _handle_rankings(self, groups, query):
+        mode = groups["mode"]
+        if mode not in MODES:
+            return self._send_json(422, {"error": "invalid mode"})
+        page = int(query.get("cursor[page]", 1))
+        data = self.server.mock.data
+        ranking = data.rankings(mode, page)
+        cursor = {"page": page + 1} if page < data.ranking_pages else None
+        self._send_json(200, {"ranking": ranking, "cursor": cursor, "total": data.ranking_pages * RANKING_PAGE_SIZE})
+
+    def _handle_beatmap(self, groups, query):
+        beatmap = self.server.mock.data.beatmap(groups["beatmap_id"])
+        if beatmap is None:
+            return self._send_json(404, {"error": None})
+        self._send_json(200, beatmap)
+
+    def _handle_best_scores(self, groups, query):
+        mode = query.get("mode", "osu")
+        if mode not in MODES:
+            return self._send_json(422, {"error": "invalid mode"})
+        limit = min(int(query.get("limit", 100)), 100)
+        offset = int(query.get("offset", 0))
+        scores = self.server.mock.data.best_scores(groups["user_id"], mode)
+        self._send_json(200, scores[offset:offset + limit])
+
+    def _handle_image(self, groups, query):
+        body = self.server.mock.data.cover
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockOsuServer:
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_429=0.0,
+                 retry_after=1, max_rpm=0, me_id=DEFAULT_USER_ID, fixtures_dir=FIXTURES_DIR, seed=0,
+                 accept_any_token=True, verbose=False):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.max_rpm = max_rpm
+        self.me_id = me_id
+        self.accept_any_token = accept_any_token
+        self.verbose = verbose
+        self.data = FixtureData(fixtures_dir, seed=seed)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._window = []  # Zeitstempel der Requests der letzten Minute (für max_rpm)
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+
+    def inject_fault(self):
+        """Latenz anwenden; liefert (status, headers) für einen injizierten Fehler oder None."""
+        delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        with self._lock:
+            if self.max_rpm:
+                now = time.monotonic()
+                self._window = [t for t in self._window if now - t < 60]
+                if len(self._window) >= self.max_rpm:
+                    self._counts["429"] = self._counts.get("429", 0) + 1
+                    wait = max(1, int(60 - (now - self._window[0])) + 1)
+                    return 429, {"Retry-After": str(wait)}
+                self._window.append(now)
+            roll = self._rng.random()
+        if roll < self.rate_429:
+            self.count("429")
+            return 429, {"Retry-After": str(self.retry_after)}
+        if roll < self.rate_429 + self.error_rate:
+            self.count("500")
+            return 500, {}
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock of the osu! API for offline load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0, help="added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="random extra latency (uniform 0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds for injected 429s")
+    parser.add_argument("--max-rpm", type=int, default=0, help="enforce a requests-per-minute limit with 429s")
+    parser.add_argument("--me-id", type=int, default=DEFAULT_USER_ID, help="user id returned by /me")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = MockOsuServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.rate_429,
+                           args.retry_after, args.max_rpm, args.me_id, args.fixtures, args.seed, verbose=args.verbose)
+    print(f"mock osu! API on {server.base_url} (set api_base_url in config.json or OSU_API_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
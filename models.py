@@ -0,0 +1,205 @@
+"""Compact score and beatmap records.
+
+The API returns every score as a nested dict (score -> beatmap, beatmapset -> covers, ...),
+which costs several kilobytes per score. The records here are parsed once at the API
+boundary (osu_api) and use __slots__, interned strings for values that repeat across
+scores (artist, mapper, difficulty name, rank) and a bitmask for mods. Mods without a
+legacy bit (lazer mods such as DA or TC) are kept as a shared tuple of acronyms next to
+the bitmask (Score.extra_mods).
+Beatmaps are shared: every score on the same beatmap and mode points to the same Beatmap
+object (converts have their own record per mode, with that mode's difficulty values).
+"""
+import sys
+import weakref
+from datetime import datetime, timezone
+
+import perf
+
+# Legacy mod bitmask (wie osu! stable / API v1)
+MOD_BITS = {
+    "NF": 1 << 0,
+    "EZ": 1 << 1,
+    "TD": 1 << 2,
+    "HD": 1 << 3,
+    "HR": 1 << 4,
+    "SD": 1 << 5,
+    "DT": 1 << 6,
+    "RX": 1 << 7,
+    "HT": 1 << 8,
+    "NC": 1 << 9,
+    "FL": 1 << 10,
+    "AT": 1 << 11,
+    "SO": 1 << 12,
+    "AP": 1 << 13,
+    "PF": 1 << 14,
+    "FI": 1 << 20,
+    "MR": 1 << 30,
+}
+# Übliche Schreibweise, passend zu MOD_OPTIONS in main.py ("HDHRDT")
+MOD_ORDER = ["EZ", "NF", "HT", "HD", "HR", "SD", "PF", "DT", "NC", "FI", "FL", "RX", "AP", "SO", "TD", "MR", "AT"]
+
+_intern = sys.intern
+
+
+def _str(value):
+    return _intern(value) if value else ""
+
+
+_extra_mods = {(): ()}  # gleiche Kombinationen teilen sich ein Tupel
+
+
+def split_mods(mods):
+    """Mod-Liste aus der API (["HD", "DT"] oder [{"acronym": "HD"}, ...]) oder String "HDDT"
+    -> (Bitmaske, Tupel der Mods ohne Legacy-Bit)."""
+    if isinstance(mods, str):
+        mods = [mods[i:i + 2] for i in range(0, len(mods), 2)]
+    bits = 0
+    extra = []
+    for mod in mods or ():
+        if isinstance(mod, dict):
+            mod = mod.get("acronym", "")
+        bit = MOD_BITS.get(mod)
+        if bit is not None:
+            bits |= bit
+        elif mod:
+            extra.append(_intern(mod))
+    extra = tuple(extra)
+    return bits, _extra_mods.setdefault(extra, extra)
+
+
+def bits_to_mods(bits):
+    return [mod for mod in MOD_ORDER if bits & MOD_BITS[mod]]
+
+
+def mods_string(bits, extra=()):
+    return "".join(bits_to_mods(bits)) + "".join(extra) or "NM"
+
+
+def _timestamp(value):
+    if not value:
+        return 0
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return 0
+
+
+class Beatmap:
+    __slots__ = (
+        "id", "beatmapset_id", "mode", "version", "status",
+        "difficulty_rating", "bpm", "total_length", "ar", "accuracy", "cs", "drain",
+        "artist", "title", "creator", "cover_url",
+        "__weakref__",
+    )
+
+    # (id, mode) -> Beatmap; hält Beatmaps nur so lange, wie noch ein Score darauf zeigt
+    _registry = weakref.WeakValueDictionary()
+
+    def __init__(self, id, beatmapset_id=0, mode="", version="", status="",
+                 difficulty_rating=0.0, bpm=0.0, total_length=0, ar=0.0, accuracy=0.0, cs=0.0, drain=0.0,
+                 artist="", title="", creator="", cover_url=""):
+        self.id = id
+        self.beatmapset_id = beatmapset_id
+        self.mode = _str(mode)
+        self.version = _str(version)
+        self.status = _str(status)
+        self.difficulty_rating = difficulty_rating
+        self.bpm = bpm
+        self.total_length = total_length
+        self.ar = ar
+        self.accuracy = accuracy
+        self.cs = cs
+        self.drain = drain
+        self.artist = _str(artist)
+        self.title = _str(title)
+        self.creator = _str(creator)
+        self.cover_url = cover_url or ""
+
+    @classmethod
+    def from_api(cls, beatmap, beatmapset=None):
+        """Beatmap aus dem API-JSON. Bereits bekannte Beatmaps (gleiche ID und Modus) werden wiederverwendet."""
+        beatmap_id = beatmap.get("id", 0)
+        key = (beatmap_id, beatmap.get("mode", ""))
+        existing = cls._registry.get(key)
+        perf.cache("beatmap", existing is not None)
+        if existing is not None:
+            return existing
+
+        beatmapset = beatmapset or beatmap.get("beatmapset") or {}
+        covers = beatmapset.get("covers") or {}
+        record = cls(
+            beatmap_id,
+            beatmapset_id=beatmap.get("beatmapset_id") or beatmapset.get("id", 0),
+            mode=beatmap.get("mode", ""),
+            version=beatmap.get("version", ""),
+            status=beatmap.get("status", ""),
+            difficulty_rating=float(beatmap.get("difficulty_rating") or 0),
+            bpm=float(beatmap.get("bpm") or 0),
+            total_length=int(beatmap.get("total_length") or 0),
+            ar=float(beatmap.get("ar") or 0),
+            accuracy=float(beatmap.get("accuracy") or 0),
+            cs=float(beatmap.get("cs") or 0),
+            drain=float(beatmap.get("drain") or 0),
+            artist=beatmapset.get("artist", ""),
+            title=beatmapset.get("title", ""),
+            creator=beatmapset.get("creator", ""),
+            cover_url=covers.get("cover") or covers.get("list") or "",
+        )
+        cls._registry[key] = record
+        return record
+
+    def __repr__(self):
+        return f"<Beatmap {self.id} {self.artist} - {self.title} [{self.version}]>"
+
+
+class Score:
+    __slots__ = ("id", "user_id", "beatmap", "pp", "accuracy", "score", "max_combo", "rank", "mods", "created_at",
+                 "extra_mods")
+
+    def __init__(self, id, user_id, beatmap, pp=0.0, accuracy=0.0, score=0, max_combo=0, rank="", mods=0, created_at=0,
+                 extra_mods=()):
+        self.id = id
+        self.user_id = user_id
+        self.beatmap = beatmap
+        self.pp = pp
+        self.accuracy = accuracy
+        self.score = score
+        self.max_combo = max_combo
+        self.rank = _str(rank)
+        self.mods = mods
+        self.created_at = created_at
+        self.extra_mods = extra_mods
+
+    @classmethod
+    def from_api(cls, score):
+        mods, extra_mods = split_mods(score.get("mods"))
+        return cls(
+            score.get("id", 0),
+            score.get("user_id", 0),
+            Beatmap.from_api(score.get("beatmap") or {}, score.get("beatmapset")),
+            pp=float(score.get("pp") or 0),
+            accuracy=float(score.get("accuracy") or 0),
+            score=int(score.get("score") or score.get("total_score") or 0),
+            max_combo=int(score.get("max_combo") or 0),
+            rank=score.get("rank", ""),
+            mods=mods,
+            created_at=_timestamp(score.get("created_at") or score.get("ended_at")),
+            extra_mods=extra_mods,
+        )
+
+    @property
+    def date(self):
+        if not self.created_at:
+            return ""
+        return datetime.fromtimestamp(self.created_at, timezone.utc).strftime("%Y-%m-%d")
+
+    @property
+    def mods_string(self):
+        return mods_string(self.mods, self.extra_mods)
+
+    def __repr__(self):
+        return f"<Score {self.id} {self.pp:.1f}pp {self.mods_string} on {self.beatmap!r}>"
+
+
+def parse_scores(scores):
+    return [Score.from_api(score) for score in scores]
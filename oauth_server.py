@@ -0,0 +1,44 @@
+# Lokaler HTTP-Server für den OAuth Callback. Wird erst beim Login importiert,
+# damit http.server nicht den Programmstart verlangsamt.
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+LOGIN_TIMEOUT = 300  # Sekunden, bis der Login im Browser abgeschlossen sein muss
+
+
+class OAuthHandler(BaseHTTPRequestHandler):
+    auth_code = None
+    def do_GET(self):
+        if self.path.startswith("/callback?code="):
+            code = self.path.split("code=")[-1].split("&")[0]
+            OAuthHandler.auth_code = code
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"<html><body><h1>Login successful! You can close this window.</h1></body></html>")
+        else:
+            self.send_error(404)
+
+
+def start_server():
+    server = HTTPServer(("localhost", 8080), OAuthHandler)
+    return server
+
+
+def wait_for_code(server, cancelled=lambda: False, timeout=LOGIN_TIMEOUT):
+    """Bearbeitet Callbacks, bis ein Code ankommt (statt serve_forever in eigenem Thread).
+
+    Liefert den Code oder None bei Abbruch; schließt den Server danach immer.
+    """
+    OAuthHandler.auth_code = None
+    server.timeout = 0.5  # handle_request kehrt regelmäßig zurück -> Abbruch prüfen
+    deadline = time.monotonic() + timeout
+    try:
+        while OAuthHandler.auth_code is None:
+            if cancelled():
+                return None
+            if time.monotonic() > deadline:
+                raise TimeoutError("no login callback received")
+            server.handle_request()
+        return OAuthHandler.auth_code
+    finally:
+        server.server_close()
@@ -0,0 +1,311 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import perf
+from cache import TTLCache
+from models import Beatmap, parse_scores
+from ratelimit import RateLimiter
+
+# --- CONFIG ---
+CONFIG_FILE = "config.json"
+REDIRECT_URI = "http://localhost:8080/callback"
+DEFAULT_BASE_URL = "https://osu.ppy.sh"
+AUTHORIZE_PATH = "/oauth/authorize"
+TOKEN_PATH = "/oauth/token"
+API_ME_PATH = "/api/v2/me"
+API_USER_PATH = "/api/v2/users/{user}"
+API_USER_BEST_SCORES_PATH = "/api/v2/users/{user_id}/scores/best"  # Für Best Scores
+API_RANKINGS_PATH = "/api/v2/rankings/{mode}/performance"
+API_BEATMAP_PATH = "/api/v2/beatmaps/{beatmap_id}"
+
+MODE_OPTIONS = ["osu", "taiko", "fruits", "mania"]
+REQUEST_TIMEOUT = 15
+MAX_PLAYER_WORKERS = 10
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # Sekunden, verdoppelt sich pro Versuch
+MAX_RETRY_AFTER = 60
+
+# osu! API: empfohlen sind höchstens 60 Requests pro Minute
+REQUESTS_PER_MINUTE = 60
+BURST = 20
+BACKGROUND_RESERVE = 10  # so viele Tokens lässt Hintergrundarbeit für die UI übrig
+
+PROFILE_TTL = 300
+SCORES_TTL = 300
+BEST_SCORES_LIMIT = 100  # API-Maximum; immer so viele holen, kleinere Limits werden aus dem Cache geschnitten
+BEATMAP_TTL = 3600
+IMAGE_TTL = 3600
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Basis-URL der API, z.B. auf mock_server.py umstellbar (config.json "api_base_url"
+# oder Umgebungsvariable OSU_API_BASE_URL)
+base_url = DEFAULT_BASE_URL
+
+_session = None
+_session_lock = threading.Lock()
+_local = threading.local()
+
+# Gemeinsam genutzt von UI, Prefetcher und Batch-Jobs
+limiter = RateLimiter(REQUESTS_PER_MINUTE, BURST)
+profile_cache = TTLCache("profile", PROFILE_TTL, max_size=256)
+scores_cache = TTLCache("best_scores", SCORES_TTL, max_size=1024)
+beatmap_cache = TTLCache("beatmap_lookup", BEATMAP_TTL, max_size=4096)
+image_cache = TTLCache("image", IMAGE_TTL, max_size=IMAGE_CACHE_BYTES, sizeof=len)
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+def get_session():
+    # Eine Session für alle Requests -> Verbindungen werden wiederverwendet.
+    # requests wird erst beim ersten Request importiert (spart ~80 ms beim Start).
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                _session = requests.Session()
+    return _session
+
+
+def configure(config=None, base=None):
+    # Vorrang: explizites base > OSU_API_BASE_URL > config.json > osu.ppy.sh
+    global base_url
+    config = config or {}
+    base_url = (base or os.environ.get("OSU_API_BASE_URL") or config.get("api_base_url") or DEFAULT_BASE_URL).rstrip("/")
+    limiter.configure(config.get("requests_per_minute"), config.get("burst"))
+
+
+def clear_caches():
+    profile_cache.clear()
+    scores_cache.clear()
+    beatmap_cache.clear()
+    image_cache.clear()
+
+
+@contextmanager
+def counted(budget):
+    """API-Requests in diesem Block (jeder Versuch, auch Retries) verbrauchen `budget`
+    (ratelimit.RequestBudget); ist es aufgebraucht, wird RequestCancelled ausgelöst."""
+    previous = getattr(_local, "budget", None)
+    _local.budget = budget
+    try:
+        yield
+    finally:
+        _local.budget = previous
+
+
+@contextmanager
+def low_priority(cancelled=None):
+    """Requests in diesem Block nutzen nur freies Budget (BACKGROUND_RESERVE bleibt für die UI).
+
+    `cancelled()` -> True bricht wartende Requests mit RequestCancelled ab.
+    """
+    previous = getattr(_local, "background", None)
+    _local.background = (BACKGROUND_RESERVE, cancelled)
+    try:
+        yield
+    finally:
+        _local.background = previous
+
+
+def url(path):
+    return base_url + path
+
+
+def authorize_url(client_id, scope="public"):
+    return f"{url(AUTHORIZE_PATH)}?client_id={client_id}&redirect_uri={REDIRECT_URI}&response_type=code&scope={scope}"
+
+
+def _retry_delay(status, headers, attempt):
+    # 429 mit Retry-After respektieren, sonst exponentielles Backoff
+    if status == 429:
+        try:
+            return min(float(headers.get("Retry-After", "")), MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return RETRY_BACKOFF * (2 ** attempt)
+
+
+def _should_retry(status):
+    return status == 429 or status >= 500
+
+
+def _request(endpoint, method, request_url, limited=True, **kwargs):
+    # Jeder Request wird pro Endpoint gemessen (Histogramm + Fehler-/Statuszähler).
+    # 429, 5xx und Verbindungsfehler werden bis zu MAX_RETRIES mal wiederholt.
+    # API-Requests (limited) laufen über den gemeinsamen Rate Limiter, Bilder vom CDN nicht.
+    import requests
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    reserve, cancelled = getattr(_local, "background", None) or (0, None)
+    budget = getattr(_local, "budget", None)
+    for attempt in range(MAX_RETRIES + 1):
+        if limited and budget is not None and not budget.take():
+            raise RequestCancelled(endpoint)
+        if limited and not limiter.acquire(reserve, cancelled):
+            raise RequestCancelled(endpoint)
+        response = None
+        with perf.timer(f"api.{endpoint}"):
+            try:
+                response = get_session().request(method, request_url, **kwargs)
+            except requests.ConnectionError:
+                perf.count(f"api.{endpoint}.error")
+                if attempt == MAX_RETRIES:
+                    raise
+            except Exception:
+                perf.count(f"api.{endpoint}.error")
+                raise
+        if response is not None:
+            perf.count(f"api.{endpoint}.status.{response.status_code}")
+            if not _should_retry(response.status_code) or attempt == MAX_RETRIES:
+                break
+        perf.count(f"api.{endpoint}.retry")
+        status, headers = (response.status_code, response.headers) if response is not None else (None, {})
+        time.sleep(_retry_delay(status, headers, attempt))
+    response.raise_for_status()
+    return response
+
+
+def load_config(path=CONFIG_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def exchange_token(code, client_id, client_secret):
+    data = {
+        "client_id": client_id,
+        "client_secret": client_secret,
+        "code": code,
+        "grant_type": "authorization_code",
+        "redirect_uri": REDIRECT_URI
+    }
+    return _request("token", "POST", url(TOKEN_PATH), json=data).json()
+
+
+def client_credentials_token(client_id, client_secret):
+    # Token ohne Browser-Login (für Server / Batch-Jobs), nur "public" Scope
+    data = {
+        "client_id": client_id,
+        "client_secret": client_secret,
+        "grant_type": "client_credentials",
+        "scope": "public"
+    }
+    return _request("token", "POST", url(TOKEN_PATH), json=data).json()
+
+
+def resolve_token(token=None, config_path=CONFIG_FILE):
+    """Token für Batch-Jobs: explizit, dann OSU_TOKEN, sonst Client Credentials aus der Config."""
+    if token:
+        return token
+    if os.environ.get("OSU_TOKEN"):
+        return os.environ["OSU_TOKEN"]
+    config = load_config(config_path)
+    client_id = config.get("client_id")
+    client_secret = config.get("client_secret")
+    if not client_id or not client_secret:
+        raise ValueError(f"client_id or client_secret missing in {config_path} (or pass --token)")
+    return client_credentials_token(client_id, client_secret)["access_token"]
+
+
+def get_user_profile(token, mode=None):
+    # Mit mode -> Statistiken für diesen Modus (/me/{mode}), sonst Standardmodus des Users
+    def load():
+        headers = {"Authorization": f"Bearer {token}"}
+        path = f"{API_ME_PATH}/{mode}" if mode else API_ME_PATH
+        profile = _request("me", "GET", url(path), headers=headers).json()
+        # Auch unter der User-ID ablegen, damit get_user() (Vergleichsansicht) den Cache teilt
+        profile_cache.set(("user", str(profile.get("id")), mode), profile)
+        return profile
+
+    return profile_cache.get_or_load(("me", token, mode), load)
+
+
+def get_user(token, user, mode=None):
+    """Profil eines beliebigen Spielers über ID oder Username (/users/{user}/{mode})."""
+    user = str(user).strip()
+    key = "id" if user.isdigit() else "username"
+    cache_key = ("user", user.lower(), mode)
+
+    def load():
+        headers = {"Authorization": f"Bearer {token}"}
+        path = API_USER_PATH.format(user=user) + (f"/{mode}" if mode else "")
+        profile = _request("user", "GET", url(path), headers=headers, params={"key": key}).json()
+        profile_cache.set(("user", str(profile.get("id")), mode), profile)
+        profile_cache.set(("user", profile.get("username", "").lower(), mode), profile)
+        return profile
+
+    return profile_cache.get_or_load(cache_key, load)
+
+
+def get_user_best_scores(token, user_id, mode, mods=None, limit=20):
+    """Best Scores als models.Score Liste (einmalig hier aus dem JSON geparst).
+
+    Es werden immer BEST_SCORES_LIMIT Scores geladen und gecacht, damit Hauptansicht (20),
+    Vergleichsansicht und Batch-Jobs (100) denselben Cache-Eintrag nutzen.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {
+        "mode": mode,
+        "limit": BEST_SCORES_LIMIT,
+    }
+    if mods:
+        params["mods"] = mods
+
+    def load():
+        response = _request("best_scores", "GET", url(API_USER_BEST_SCORES_PATH.format(user_id=user_id)), headers=headers, params=params)
+        with perf.timer("parse.best_scores"):
+            return parse_scores(response.json())
+
+    return scores_cache.get_or_load((int(user_id), mode, mods or ""), load)[:limit]
+
+
+def get_beatmap(token, beatmap_id):
+    """Einzelne Beatmap (inkl. Beatmapset) als models.Beatmap."""
+    def load():
+        headers = {"Authorization": f"Bearer {token}"}
+        data = _request("beatmap", "GET", url(API_BEATMAP_PATH.format(beatmap_id=beatmap_id)), headers=headers).json()
+        return Beatmap.from_api(data)
+
+    return beatmap_cache.get_or_load(int(beatmap_id), load)
+
+
+def get_rankings(token, mode, page=1, country=None):
+    """Eine Seite (50 Spieler) der pp-Rangliste. Liefert das JSON mit "ranking" und "cursor"."""
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"cursor[page]": page}
+    if country:
+        params["country"] = country
+    return _request("rankings", "GET", url(API_RANKINGS_PATH.format(mode=mode)), headers=headers, params=params).json()
+
+
+def get_players(token, users, mode, limit=100, max_workers=MAX_PLAYER_WORKERS):
+    """Profile + Best Scores mehrerer Spieler parallel laden.
+
+    Liefert eine Liste in der Reihenfolge von `users` mit (profile, scores) oder der Exception.
+    """
+    def load(user):
+        try:
+            profile = get_user(token, user, mode)
+            return profile, get_user_best_scores(token, profile["id"], mode, limit=limit)
+        except Exception as e:
+            return e
+
+    users = list(users)
+    if not users:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(users))) as pool:
+        return list(pool.map(load, users))
+
+
+def download_image(image_url):
+    return image_cache.get_or_load(image_url, lambda: _request("image", "GET", image_url, limited=False).content)
+
+
+configure(load_config())
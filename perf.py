@@ -0,0 +1,178 @@
+"""Lightweight performance instrumentation: timers, counters, gauges and cache hit rates.
+
+Cheap enough to stay enabled in release builds (one perf_counter pair and a short
+locked update per measurement). Disable with the environment variable OSU_VIEWER_PERF=0.
+
+    with perf.timer("api.best_scores"):
+        ...
+    perf.count("api.best_scores.error")
+    perf.gauge("queue.prefetch", len(queue))
+    perf.cache("beatmap", hit=True)
+
+snapshot() returns everything as a dict, export_json() writes it to a file.
+"""
+import json
+import os
+import threading
+import time
+
+enabled = os.environ.get("OSU_VIEWER_PERF", "1") != "0"
+
+# Obergrenzen der Histogramm-Buckets in Millisekunden (letzter Bucket: alles darüber)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_gauges = {}
+_started = time.time()
+
+
+class Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms < self.min:
+            self.min = ms
+        if ms > self.max:
+            self.max = ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, p):
+        # Obergrenze des Buckets, in dem das p-Quantil liegt (max für den offenen Bucket)
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets_ms": dict(zip([str(b) for b in BUCKETS_MS] + ["inf"], self.buckets)),
+        }
+
+
+def record(name, seconds):
+    if not enabled:
+        return
+    ms = seconds * 1000
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.add(ms)
+
+
+class timer:
+    """Context manager, misst die Dauer des Blocks unter `name`."""
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def count(name, n=1):
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def gauge(name, value):
+    # aktueller Wert und Höchststand, z.B. für Queue-Längen
+    if not enabled:
+        return
+    with _lock:
+        _, peak = _gauges.get(name, (0, value))
+        _gauges[name] = (value, max(peak, value))
+
+
+def cache(name, hit):
+    count(f"cache.{name}.{'hit' if hit else 'miss'}")
+
+
+def hit_rates():
+    with _lock:
+        counters = dict(_counters)
+    rates = {}
+    for key, hits in counters.items():
+        if key.startswith("cache.") and key.endswith(".hit"):
+            name = key[len("cache."):-len(".hit")]
+            misses = counters.get(f"cache.{name}.miss", 0)
+            rates[name] = round(hits / (hits + misses), 4)
+    for key in counters:
+        if key.startswith("cache.") and key.endswith(".miss"):
+            rates.setdefault(key[len("cache."):-len(".miss")], 0.0)
+    return rates
+
+
+def snapshot():
+    with _lock:
+        data = {
+            "uptime_s": round(time.time() - _started, 1),
+            "timers": {name: hist.to_dict() for name, hist in sorted(_histograms.items())},
+            "counters": dict(sorted(_counters.items())),
+            "gauges": {name: {"value": v, "peak": p} for name, (v, p) in sorted(_gauges.items())},
+        }
+    data["cache_hit_rates"] = hit_rates()
+    return data
+
+
+def format_snapshot(data=None):
+    """Kompakte Textansicht für das Debug-Panel."""
+    data = data or snapshot()
+    lines = [f"uptime: {data['uptime_s']} s", "", "timers (count  mean  p50  p95  max, ms):"]
+    for name, t in data["timers"].items():
+        lines.append(f"  {name:<28} {t['count']:>6} {t['mean_ms']:>9.1f} {t['p50_ms']:>7} {t['p95_ms']:>7} {t['max_ms']:>9.1f}")
+    lines += ["", "cache hit rates:"]
+    lines += [f"  {name:<28} {rate:>7.1%}" for name, rate in data["cache_hit_rates"].items()]
+    lines += ["", "gauges (value / peak):"]
+    lines += [f"  {name:<28} {g['value']:>6} / {g['peak']}" for name, g in data["gauges"].items()]
+    lines += ["", "counters:"]
+    lines += [f"  {name:<28} {n:>6}" for name, n in data["counters"].items()]
+    return "\n".join(lines)
+
+
+def export_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def reset():
+    global _started
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _gauges.clear()
+        _started = time.time()
@@ -0,0 +1,98 @@
+"""Background prefetching of the views a user is likely to open next.
+
+After the first profile view has rendered, the Prefetcher warms the osu_api caches for
+the other game modes (profile, best scores, then their cover images), so a mode switch
+is served from cache. It runs as one task on the app's executor (or on its own daemon
+thread) and pauses while the user is interacting. API requests go through osu_api.low_priority(), so they only use spare
+rate-limit budget. start() is called again after every mode switch: entries that are
+still cached cost nothing, expired ones (PROFILE_TTL / SCORES_TTL) are fetched again.
+"""
+import threading
+import time
+
+import osu_api
+import perf
+
+
+class Prefetcher:
+    IDLE_AFTER = 1.5   # Sekunden ohne Eingabe, bevor weitergeladen wird
+    POLL = 0.25
+
+    def __init__(self, token, user_id, is_idle=None):
+        self.token = token
+        self.user_id = user_id
+        self.is_idle = is_idle or (lambda: True)
+        self._stop = threading.Event()
+        self._run_id = 0  # nur der zuletzt gestartete Durchgang läuft weiter
+        self._thread = None
+
+    def start(self, current_mode, modes=osu_api.MODE_OPTIONS, executor=None):
+        """Startet das Vorladen; mit `executor` (executor.TaskExecutor) als I/O-Task statt eigenem Thread.
+
+        Ein erneuter Aufruf ersetzt einen noch laufenden Durchgang.
+        """
+        if self.stopped:
+            return
+        self._run_id += 1
+        run_id = self._run_id
+        # Modi in Wechselreihenfolge ab dem aktuellen (osu -> taiko -> fruits -> mania -> osu)
+        start = modes.index(current_mode) if current_mode in modes else 0
+        order = [modes[(start + i) % len(modes)] for i in range(1, len(modes))]
+        if executor is not None:
+            executor.submit(self._run, order, run_id, key="prefetch", name="prefetch")
+        else:
+            self._thread = threading.Thread(target=self._run, args=(order, run_id), daemon=True, name="prefetch")
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def _cancelled(self, run_id):
+        return self._stop.is_set() or run_id != self._run_id
+
+    def _wait_until_idle(self, run_id):
+        while not self._cancelled(run_id) and not self.is_idle():
+            self._stop.wait(self.POLL)
+        return not self._cancelled(run_id)
+
+    def _run(self, modes, run_id):
+        # Erst Profile + Scores aller Modi (API-Budget), danach die Cover (CDN)
+        tasks = []
+        for mode in modes:
+            tasks.append(("profile", mode))
+            tasks.append(("scores", mode))
+        covers = []
+
+        while tasks and self._wait_until_idle(run_id):
+            perf.gauge("queue.prefetch", len(tasks) + len(covers))
+            kind, mode = tasks.pop(0)
+            try:
+                with perf.timer(f"prefetch.{kind}"), osu_api.low_priority(cancelled=lambda: self._cancelled(run_id)):
+                    if kind == "profile":
+                        osu_api.get_user_profile(self.token, mode)
+                    else:
+                        scores = osu_api.get_user_best_scores(self.token, self.user_id, mode)
+                        covers.extend(s.beatmap.cover_url for s in scores if s.beatmap.cover_url)
+            except osu_api.RequestCancelled:
+                return
+            except Exception:
+                perf.count("prefetch.error")
+
+        while covers and self._wait_until_idle(run_id):
+            perf.gauge("queue.prefetch", len(covers))
+            try:
+                with perf.timer("prefetch.image"):
+                    osu_api.download_image(covers.pop(0))
+            except Exception:
+                perf.count("prefetch.error")
+        if not self._cancelled(run_id):
+            perf.gauge("queue.prefetch", 0)
+
+
+def idle_since(get_last_interaction, idle_after=Prefetcher.IDLE_AFTER):
+    """is_idle-Callback: True, wenn die letzte Eingabe länger als `idle_after` her ist."""
+    return lambda: time.monotonic() - get_last_interaction() >= idle_after
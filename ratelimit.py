@@ -0,0 +1,81 @@
+"""Token bucket rate limiter for the osu! API request budget.
+
+One limiter (osu_api.limiter) is shared by the UI, the prefetcher and batch jobs.
+Background work passes a `reserve`: it only takes a token while more than `reserve`
+tokens remain, so foreground requests always find budget left.
+
+RequestBudget caps the total number of requests of one job (e.g. crawler.py --budget),
+retries included.
+"""
+import threading
+import time
+
+import perf
+
+
+class RateLimiter:
+    def __init__(self, per_minute=60, burst=20):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def configure(self, per_minute=None, burst=None):
+        with self._lock:
+            if per_minute:
+                self.rate = per_minute / 60.0
+            if burst:
+                self.burst = burst
+                self.tokens = min(self.tokens, burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, reserve=0):
+        """Nimmt einen Token, falls möglich, und liefert 0. Sonst die Wartezeit in Sekunden."""
+        with self._lock:
+            self._refill()
+            needed = 1 + min(reserve, self.burst - 1)
+            if self.tokens >= needed:
+                self.tokens -= 1
+                perf.gauge("ratelimit.tokens", int(self.tokens))
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    def acquire(self, reserve=0, cancelled=None):
+        """Blockiert bis ein Token frei ist. `cancelled()` -> True bricht ab (liefert False)."""
+        start = time.perf_counter()
+        while True:
+            wait = self.reserve(reserve)
+            if wait == 0.0:
+                break
+            if cancelled is not None and cancelled():
+                return False
+            time.sleep(min(wait, 0.5))
+        waited = time.perf_counter() - start
+        if waited > 0.001:
+            perf.record("ratelimit.wait", waited)
+        return True
+
+
+class RequestBudget:
+    """Zählt echte Request-Versuche (inkl. Retries) und lässt höchstens `limit` zu."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def left(self):
+        return self.limit - self.used
@@ -0,0 +1,85 @@
+import math
+
+# Beatmap-Attribute aus der API, die den Spielstil beschreiben
+FEATURES = ["difficulty_rating", "bpm", "total_length", "ar", "accuracy", "cs", "drain"]
+
+# Mindest-Streuung pro Attribut, damit ein sehr einheitliches Profil nicht alles ausschließt
+MIN_SPREAD = {
+    "difficulty_rating": 0.25,
+    "bpm": 10.0,
+    "total_length": 30.0,
+    "ar": 0.3,
+    "accuracy": 0.3,
+    "cs": 0.3,
+    "drain": 0.3,
+}
+
+
+def _features(beatmap):
+    return [getattr(beatmap, name) for name in FEATURES]
+
+
+def build_profile(scores):
+    """pp-gewichteter Mittelwert und Streuung der Beatmap-Attribute der Top Plays."""
+    rows = []
+    weights = []
+    for score in scores:
+        rows.append(_features(score.beatmap))
+        weights.append(max(score.pp, 1.0))
+    if not rows:
+        return None
+
+    total = sum(weights)
+    mean = [sum(w * row[i] for row, w in zip(rows, weights)) / total for i in range(len(FEATURES))]
+    spread = []
+    for i, name in enumerate(FEATURES):
+        var = sum(w * (row[i] - mean[i]) ** 2 for row, w in zip(rows, weights)) / total
+        spread.append(max(math.sqrt(var), MIN_SPREAD[name]))
+    return {"mean": mean, "spread": spread}
+
+
+def distance(profile, beatmap):
+    return math.sqrt(sum(
+        ((x - m) / s) ** 2
+        for x, m, s in zip(_features(beatmap), profile["mean"], profile["spread"])
+    ))
+
+
+def candidates_from_scores(scores):
+    """Beatmaps aus beliebigen Scores, dedupliziert nach Beatmap-ID."""
+    seen = {}
+    for score in scores:
+        seen.setdefault(score.beatmap.id, score.beatmap)
+    return list(seen.values())
+
+
+def recommend(user_scores, candidates, limit=10):
+    """Die `limit` Beatmaps aus `candidates`, die dem Profil der Top Plays am nächsten sind.
+
+    `candidates` ist eine Liste von models.Beatmap, siehe candidates_from_scores.
+    Bereits gespielte Beatmaps werden übersprungen.
+    """
+    profile = build_profile(user_scores)
+    if profile is None:
+        return []
+
+    played = {score.beatmap.id for score in user_scores}
+    ranked = []
+    for beatmap in candidates:
+        if beatmap.id in played:
+            continue
+        ranked.append((distance(profile, beatmap), beatmap))
+    ranked.sort(key=lambda item: item[0])
+
+    return [
+        {
+            "beatmap_id": beatmap.id,
+            "beatmapset_id": beatmap.beatmapset_id,
+            "artist": beatmap.artist,
+            "title": beatmap.title,
+            "version": beatmap.version,
+            "stars": beatmap.difficulty_rating,
+            "distance": round(dist, 4),
+        }
+        for dist, beatmap in ranked[:limit]
+    ]
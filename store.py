@@ -0,0 +1,224 @@
+"""Local SQLite store for the recommendation corpus (players, beatmaps, best scores).
+
+Written by crawler.py in batched transactions; read back as models.Score lists, for
+example to update a collaborative.PlayMatrix incrementally. Crawl progress (ranking
+cursor, which players are done) lives in the same database, so a crawl resumes
+where it stopped.
+"""
+import sqlite3
+import time
+
+from models import Beatmap, Score, split_mods
+
+MAX_ATTEMPTS = 3  # Spieler mit so vielen Fehlversuchen werden nicht mehr angefragt
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    user_id INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    username TEXT,
+    pp REAL,
+    global_rank INTEGER,
+    crawled_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, mode)
+);
+CREATE INDEX IF NOT EXISTS players_pending ON players (mode, crawled_at);
+
+CREATE TABLE IF NOT EXISTS beatmaps (
+    beatmap_id INTEGER NOT NULL,
+    beatmapset_id INTEGER,
+    mode TEXT,
+    version TEXT,
+    status TEXT,
+    difficulty_rating REAL,
+    bpm REAL,
+    total_length INTEGER,
+    ar REAL,
+    accuracy REAL,
+    cs REAL,
+    drain REAL,
+    artist TEXT,
+    title TEXT,
+    creator TEXT,
+    cover_url TEXT,
+    PRIMARY KEY (beatmap_id, mode)
+);
+
+CREATE TABLE IF NOT EXISTS scores (
+    user_id INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    beatmap_id INTEGER NOT NULL,
+    score_id INTEGER,
+    pp REAL,
+    accuracy REAL,
+    score INTEGER,
+    max_combo INTEGER,
+    rank TEXT,
+    mods INTEGER,
+    created_at INTEGER,
+    extra_mods TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (user_id, mode, beatmap_id)
+);
+
+CREATE TABLE IF NOT EXISTS crawl_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+BEATMAP_COLUMNS = ("beatmap_id", "beatmapset_id", "mode", "version", "status", "difficulty_rating", "bpm",
+                   "total_length", "ar", "accuracy", "cs", "drain", "artist", "title", "creator", "cover_url")
+
+
+class CorpusStore:
+    def __init__(self, path):
+        self.path = path
+        # check_same_thread=False: Crawler-Worker lesen, geschrieben wird nur aus einem Thread
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self._migrate_beatmaps()
+        self.db.executescript(SCHEMA)
+        # Ältere Korpus-Dateien um neue Spalten ergänzen
+        self._add_column("players", "attempts", "INTEGER NOT NULL DEFAULT 0")
+        self._add_column("scores", "extra_mods", "TEXT NOT NULL DEFAULT ''")
+        self.db.commit()
+
+    def _migrate_beatmaps(self):
+        # Ältere Dateien haben nur beatmap_id als Schlüssel; Converts brauchen eine Zeile pro Modus
+        pk = [row[1] for row in self.db.execute("PRAGMA table_info(beatmaps)") if row[5]]
+        if pk == ["beatmap_id"]:
+            self.db.executescript(
+                "BEGIN; ALTER TABLE beatmaps RENAME TO beatmaps_old;" + SCHEMA +
+                f"INSERT OR IGNORE INTO beatmaps SELECT {', '.join(BEATMAP_COLUMNS)} FROM beatmaps_old;"
+                "DROP TABLE beatmaps_old; COMMIT;"
+            )
+
+    def _add_column(self, table, column, definition):
+        columns = {row[1] for row in self.db.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self.db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def close(self):
+        self.db.close()
+
+    # --- Crawl-Zustand ---
+
+    def get_state(self, key, default=None):
+        row = self.db.execute("SELECT value FROM crawl_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def add_players(self, mode, players, state=None):
+        """Neue Spieler (noch nicht gecrawlt) eintragen; bekannte bleiben unverändert.
+
+        `players`: [(user_id, username, pp, global_rank)], `state`: {key: value} im selben Commit.
+        """
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO players (user_id, mode, username, pp, global_rank) VALUES (?, ?, ?, ?, ?)",
+                [(user_id, mode, username, pp, rank) for user_id, username, pp, rank in players],
+            )
+            self._set_state(state)
+
+    def _set_state(self, state):
+        if state:
+            self.db.executemany("INSERT OR REPLACE INTO crawl_state (key, value) VALUES (?, ?)",
+                                [(key, str(value)) for key, value in state.items()])
+
+    def pending_players(self, mode, limit, max_attempts=MAX_ATTEMPTS):
+        # Fehlgeschlagene Spieler kommen erst nach den noch nie versuchten dran (Backoff)
+        # und nach `max_attempts` Fehlern gar nicht mehr
+        rows = self.db.execute(
+            "SELECT user_id FROM players WHERE mode = ? AND crawled_at IS NULL AND attempts < ? "
+            "ORDER BY attempts, global_rank LIMIT ?",
+            (mode, max_attempts, limit),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def retrying(self, mode, user_ids):
+        """Die User-IDs aus `user_ids`, die schon mindestens einmal fehlgeschlagen sind."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        rows = self.db.execute(
+            f"SELECT user_id FROM players WHERE mode = ? AND attempts > 0 AND user_id IN ({', '.join('?' * len(user_ids))})",
+            (mode, *user_ids),
+        )
+        return {row[0] for row in rows}
+
+    def counts(self, mode):
+        players, crawled, given_up = self.db.execute(
+            "SELECT COUNT(*), COUNT(crawled_at), COUNT(CASE WHEN crawled_at IS NULL AND attempts >= ? THEN 1 END) "
+            "FROM players WHERE mode = ?", (MAX_ATTEMPTS, mode)).fetchone()
+        scores = self.db.execute("SELECT COUNT(*) FROM scores WHERE mode = ?", (mode,)).fetchone()[0]
+        beatmaps = self.db.execute("SELECT COUNT(*) FROM beatmaps WHERE mode = ?", (mode,)).fetchone()[0]
+        return {"players": players, "crawled": crawled, "failed": given_up, "scores": scores, "beatmaps": beatmaps}
+
+    # --- Scores ---
+
+    def write_batch(self, mode, results, state=None, failed=()):
+        """Best Scores mehrerer Spieler in einer Transaktion schreiben und sie als gecrawlt markieren.
+
+        `results`: [(user_id, [models.Score])]. Beatmaps werden pro (ID, Modus) dedupliziert (INSERT OR REPLACE).
+        `failed`: User-IDs, deren Abruf fehlgeschlagen ist; ihr Fehlerzähler steigt im selben Commit.
+        """
+        now = time.time()
+        beatmaps = {}
+        score_rows = []
+        for user_id, scores in results:
+            for s in scores:
+                beatmaps[s.beatmap.id, s.beatmap.mode] = s.beatmap
+                score_rows.append((user_id, mode, s.beatmap.id, s.id, s.pp, s.accuracy, s.score, s.max_combo,
+                                   s.rank, s.mods, s.created_at, ",".join(s.extra_mods)))
+        with self.db:
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO beatmaps ({', '.join(BEATMAP_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(BEATMAP_COLUMNS))})",
+                [(b.id,) + tuple(getattr(b, c) for c in BEATMAP_COLUMNS[1:]) for b in beatmaps.values()],
+            )
+            self.db.executemany(
+                "INSERT OR REPLACE INTO scores (user_id, mode, beatmap_id, score_id, pp, accuracy, score, "
+                "max_combo, rank, mods, created_at, extra_mods) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                score_rows,
+            )
+            self.db.executemany(
+                "INSERT INTO players (user_id, mode, crawled_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id, mode) DO UPDATE SET crawled_at = excluded.crawled_at",
+                [(user_id, mode, now) for user_id, _ in results],
+            )
+            self.db.executemany(
+                "UPDATE players SET attempts = attempts + 1 WHERE user_id = ? AND mode = ?",
+                [(user_id, mode) for user_id in failed],
+            )
+            self._set_state(state)
+
+    def beatmaps(self, mode=None):
+        query = f"SELECT {', '.join(BEATMAP_COLUMNS)} FROM beatmaps"
+        rows = self.db.execute(query + " WHERE mode = ?", (mode,)) if mode else self.db.execute(query)
+        return {row[0]: Beatmap(*row) for row in rows}
+
+    def player_scores(self, mode, skip=()):
+        """Liefert (user_id, [models.Score]) für alle gecrawlten Spieler außer `skip`."""
+        beatmaps = self.beatmaps(mode)
+        rows = self.db.execute(
+            "SELECT s.user_id, s.beatmap_id, s.score_id, s.pp, s.accuracy, s.score, s.max_combo, s.rank, "
+            "s.mods, s.created_at, s.extra_mods FROM scores s JOIN players p ON p.user_id = s.user_id AND p.mode = s.mode "
+            "WHERE s.mode = ? AND p.crawled_at IS NOT NULL ORDER BY s.user_id",
+            (mode,),
+        )
+        current, scores = None, []
+        for user_id, beatmap_id, score_id, pp, acc, score, combo, rank, mods, created_at, extra in rows:
+            if user_id != current:
+                if scores:
+                    yield current, scores
+                current, scores = user_id, []
+            if user_id in skip:
+                continue
+            extra_mods = split_mods(extra.split(","))[1] if extra else ()
+            # Ältere Dateien können Converts noch unter einem anderen Modus gespeichert haben
+            beatmap = beatmaps.get(beatmap_id) or Beatmap(beatmap_id, mode=mode)
+            scores.append(Score(score_id, user_id, beatmap, pp, acc, score, combo, rank, mods, created_at,
+                                extra_mods))
+        if scores:
+            yield current, scores